@@ -1,33 +1,82 @@
-from csv import DictReader
+import asyncio
+import base64
+import json
 import os
 import uuid
 import uvicorn
 
-from fastapi import FastAPI, HTTPException, Depends, Query, UploadFile, File, Form
-from sqlalchemy import desc, asc, func
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, delete, desc, asc, func, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict
-
-from models import AgeGroup, Category, Gender, Base, Archer, Competition, Language
-from schemas import ArcherCreate, ArcherOut, ArcherScoreUpdate, CompetitionOut
-from constants import DATABASE_URL, UPLOAD_DIR
-from database import SessionLocal, engine
-from middleware import setup_cors
-from storage import save_uploaded_file, setup_storage
-from parse import parse_category
+from itertools import groupby
+from typing import Any, AsyncIterator, Optional, List, Dict, Set, Tuple
+
+from models import (
+    AgeGroup, Category, Gender, Archer, Competition, Language, ScoreEntry, Season, SeasonStanding,
+    SCORE_VALUES,
+)
+from schemas import (
+    ArcherCreate, ArcherOut, ArcherPage, ArcherPatch, ArcherScoreBatchItem, ArcherScoreUpdate, CompetitionOut,
+    DivisionLeaderboard, DivisionReassign, ImportJobOut, ScoreBatchError, ScoreBatchResult, ScoreEntryCreate, ScoreEntryOut, SeasonCreate,
+    SeasonOut, StandingOut, TargetProgressOut,
+)
+from constants import BACKEND_HOST, BACKEND_WORKERS, DATABASE_URL, LIVE_KEEPALIVE_SECONDS, UPLOAD_DIR
+from database import SessionLocal, engine, fetch_all, fetch_scalars, prepare_database
+from middleware import setup_cors, setup_metrics
+from metrics import metrics
+from logs import get_logger, get_sampled_logger, setup_logging
+from storage import sanitize_string, save_uploaded_file, setup_storage
+from cache import result_cache
+from idempotency import commit, remember, replay, request_hash
+from search import index_archers, search_statement, unindex_archers, unindex_selected
+from serialization import dumps
+from live import live_hub
+from coordination import coordination
 
 # DATABASE_URL = "sqlite:///./database.db"
 
-Base.metadata.create_all(bind=engine)
+# CSV import, result export and season standings are imported on first use, keeping them off the startup path
+
+setup_logging()
+logger = get_logger("app")
+# per-request messages are sampled so they do not slow down hot endpoints
+hot_logger = get_sampled_logger("requests")
 
 app = FastAPI()
 
 # apply CORS middleware
 setup_cors(app)
 
+# request timing and query counts
+setup_metrics(app)
+
 # file upload directory & static hosting
 setup_storage(app)
 
+# columns that can be projected by the paginated archer listing
+ARCHER_COLUMNS: Dict[str, Any] = {name: getattr(Archer, name) for name in ArcherOut.model_fields}
+
+# read endpoints select exactly these columns and serialize the rows without ORM objects or validation
+ARCHER_OUT_COLUMNS: List[Any] = list(ARCHER_COLUMNS.values())
+
+# values written by the set-based score resets
+CLEARED_SCORES: Dict[str, Any] = {**{field: None for field in SCORE_VALUES}, "total_score": 0, "version": Archer.version + 1}
+
+# scorecard overwrites would no longer add up with the archer's score entries
+SCORED_PER_TARGET: str = "Archer is scored per target, change their score entries instead"
+
+# score entries would no longer add up with a scorecard entered as a whole
+SCORED_BY_SCORECARD: str = "Archer has a scorecard without score entries, clear their score first"
+
+# archer columns clients can change with partial updates
+ARCHER_PATCH_FIELDS: List[str] = ["club", "category", "gender", "age_group", *SCORE_VALUES]
+
+
+def archer_rows(rows: List[Any]) -> List[Dict[str, Any]]:
+    return [row._asdict() for row in rows]
+
 
 def get_db():
     db = SessionLocal()
@@ -37,6 +86,137 @@ def get_db():
         db.close()
 
 
+def get_division_place(db: Session, archer: Archer) -> int:
+    # same ordering as the RANK() window of the leaderboard: total score, then number of 20s and 18s
+    def ranking(model: Any) -> Any:
+        return tuple_(model.total_score, func.coalesce(model.score20, 0), func.coalesce(model.score18, 0))
+
+    better: int = db.query(func.count(Archer.id)).filter(
+        Archer.competition_id == archer.competition_id,
+        Archer.category == archer.category,
+        Archer.gender == archer.gender,
+        Archer.age_group == archer.age_group,
+        ranking(Archer) > tuple_(archer.total_score, archer.score20 or 0, archer.score18 or 0),
+    ).scalar()
+
+    return better + 1
+
+
+def apply_archer_filters(
+    query: Select,
+    comp_id: int,
+    club: Optional[str],
+    bow_category: Optional[Category],
+    gender: Optional[Gender],
+    age_group: Optional[AgeGroup]
+) -> Select:
+    query = query.where(Archer.competition_id == comp_id)
+
+    # apply optional filters
+    if club is not None:
+        query = query.where(Archer.club == club)
+    if bow_category is not None:
+        query = query.where(Archer.category == bow_category)
+    if gender is not None:
+        query = query.where(Archer.gender == gender)
+    if age_group is not None:
+        query = query.where(Archer.age_group == age_group)
+
+    return query
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # only plain sort key values may end up in the keyset comparison
+    if not isinstance(values, list) or not all(value is None or isinstance(value, (int, float, str)) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def write_archer(db: Session, archer_id: int, values: Dict[str, Any], expected_version: Optional[int]) -> Any:
+    """
+    Writes the given fields of an archer with a single conditional UPDATE and returns the new row.
+
+    With expected_version the write only applies if nobody changed the archer since the client
+    read it, otherwise it fails with 409. The total is recomputed in SQL from the sent scores
+    and the stored ones, so partial score updates do not need to read the row first.
+    """
+    # the club and division columns cannot be empty, a null there means "unchanged"
+    for field in ("club", "category", "gender", "age_group"):
+        if values.get(field, ...) is None:
+            del values[field]
+
+    scores: Dict[str, Optional[int]] = {field: values[field] for field in SCORE_VALUES if field in values}
+    if scores:
+        values["total_score"] = Archer.total_score_expression(scores)
+
+    statement = update(Archer).where(Archer.id == archer_id)
+    if expected_version is not None:
+        statement = statement.where(Archer.version == expected_version)
+    if scores:
+        # the aggregates of archers scored per target are derived from their score entries
+        statement = statement.where(~select(ScoreEntry.id).where(ScoreEntry.archer_id == archer_id).exists())
+    row = db.execute(
+        statement.values(**values, version=Archer.version + 1).returning(*ARCHER_OUT_COLUMNS),
+        execution_options={"synchronize_session": False},
+    ).first()
+
+    if row is None:
+        current: Optional[int] = db.execute(select(Archer.version).where(Archer.id == archer_id)).scalar()
+        db.rollback()
+        if current is None:
+            raise HTTPException(status_code=404, detail="Archer not found")
+        if scores and db.execute(select(ScoreEntry.id).where(ScoreEntry.archer_id == archer_id).limit(1)).first():
+            raise HTTPException(status_code=409, detail=SCORED_PER_TARGET)
+        raise HTTPException(status_code=409, detail=f"Archer was changed by another client, current version is {current}")
+
+    if "club" in values:
+        # the club is searchable
+        index_archers(db, [row])
+    return row
+
+
+def commit_archer_write(
+    db: Session,
+    archer_id: int,
+    values: Dict[str, Any],
+    expected_version: Optional[int],
+    idempotency_key: Optional[str],
+    scope: str,
+    payload_hash: str
+) -> Response:
+    row = write_archer(db, archer_id, values, expected_version)
+    body: bytes = dumps(row._asdict())
+    remember(db, idempotency_key, scope, payload_hash, body)
+
+    replayed: Optional[Response] = commit(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    result_cache.invalidate(row.competition_id)
+    publish_archer_update(db, "updated", row)
+    return Response(content=body, media_type="application/json")
+
+
+def publish_archer_update(db: Session, event: str, archer: Any) -> None:
+    # push the archer's new row and place within their division to live subscribers
+    comp_id: int = archer.competition_id  # type: ignore
+    if not live_hub.has_subscribers(comp_id):
+        return
+
+    live_hub.publish(comp_id, event, {
+        "archer": ArcherOut.model_validate(archer).model_dump(mode="json"),
+        "place": get_division_place(db, archer),
+    })
+
+
 # ----------------------------
 # API endpoints
 # ----------------------------
@@ -46,9 +226,8 @@ def get_db():
 # ----------------------------
 @app.on_event("startup")
 def startup_event() -> None:
-    print("Using database:", DATABASE_URL)
-    print("Creating tables if they do not yet exist...")
-    Base.metadata.create_all(bind=engine)
+    logger.info("Using database: %s", DATABASE_URL)
+    prepare_database(engine)
     return
 
 
@@ -57,6 +236,12 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def get_metrics() -> Response:
+    # Prometheus text exposition format
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # ----------------------------
 # ARCHERS
 # ----------------------------
@@ -65,144 +250,298 @@ def upload_data_into_db(
     file: UploadFile = File(...),
     competition_id: int = Form(...),
     language: Language = Form(Language.EN.value),    # default language is English
+    background: bool = Form(False),                  # import in a background job and return its id
     db: Session = Depends(get_db)
-) -> None:
+) -> Dict[str, Any]:
     # check if competition exists
     competition: Optional[Competition] = db.query(Competition).filter(Competition.id == competition_id).first()
     
     if competition is None:
         raise HTTPException(status_code=404, detail="Competition not found")
 
-    # read uploaded CSV file
-    content: List[str] = file.file.read().decode('utf-8').splitlines()
-    reader: DictReader[str] = DictReader(content)
-
-    for row in reader:
-        email: str = row.get("Email", "")
-        club: str = row.get("Klub", "")
-
-        full_name: str = row.get("Ime in Priimek", "")
-        if " " in full_name:
-            first_name, last_name = full_name.split(' ', 1)
-        else:
-            first_name, last_name = full_name, ""
-
-        full_category: str = row.get("Slog", "")
-        category, gender, age_group = parse_category(full_category, language)
-
-        archer = Archer(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            club=club,
-            competition_id=competition_id,  # set foreign key
-            category=category,
-            gender=gender,
-            age_group=age_group,
-            score20=None,
-            score18=None,
-            score16=None,
-            score14=None,
-            score12=None,
-            score10=None,
-            score8=None,
-            score6=None,
-            score4=None,
-            score0=None,
-        )
+    from imports import ImportJob, import_archers_csv, import_jobs
 
-        # avoid duplicates
-        exists: Optional[Archer] = db.query(Archer).filter(
-            Archer.first_name == first_name,
-            Archer.last_name == last_name
-        ).first()
+    if background:
+        job: ImportJob = import_jobs.submit(file.file, competition_id, language)
+        return {"job_id": job.id}
 
-        if exists is None:
-            db.add(archer)
+    try:
+        job = import_archers_csv(db, file.file, language, ImportJob(competition_id))
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Could not decode CSV file")
     
-    db.commit()
     db.close()
-    print("Archers loaded from CSV into DB")
+    return {"inserted": job.inserted, "skipped": job.skipped, "failed": job.failed}
+
+
+@app.get("/imports/{job_id}", response_model=ImportJobOut)
+def get_import_job(job_id: str) -> Any:
+    from imports import ImportJob, import_jobs
+
+    job: Optional[ImportJob] = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 
 @app.post("/archers/score", response_model=ArcherOut)
 def update_archer_score(
     update: ArcherScoreUpdate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-) -> ArcherOut:
-    # find correct archer
-    archer: Optional[Archer] = db.query(Archer).filter(
-        Archer.first_name == update.first_name,
-        Archer.last_name == update.last_name
-    ).first()
+) -> Response:
+    scope: str = f"{request.method} {request.url.path}"
+    payload_hash: str = request_hash(update.model_dump(mode="json", exclude_unset=True))
+    replayed: Optional[Response] = replay(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    # find correct archer (by name within the competition, served by ux_archers_competition_name)
+    query: Select = select(Archer.id).where(
+        Archer.last_name == update.last_name,
+        Archer.first_name == update.first_name
+    )
+    if update.competition_id is not None:
+        query = query.where(Archer.competition_id == update.competition_id)
+    else:
+        # clients that do not send a competition get the archer from the most recent one
+        query = query.order_by(desc(Archer.competition_id))
+
+    archer_id: Optional[int] = db.execute(query.limit(1)).scalar()
 
-    if not archer:
+    if archer_id is None:
         raise HTTPException(status_code=404, detail="Archer not found")
-    
-    print("archer found:", archer.first_name, archer.last_name)
-    print("updating scores:", update)
-
-    archer.club = update.club           # type: ignore
-    archer.category = update.category   # type: ignore
-    archer.age_group = update.age_group # type: ignore
-    archer.gender = update.gender       # type: ignore
-
-    archer.score20 = update.score20 # type: ignore
-    archer.score18 = update.score18 # type: ignore
-    archer.score16 = update.score16 # type: ignore
-    archer.score14 = update.score14 # type: ignore
-    archer.score12 = update.score12 # type: ignore
-    archer.score10 = update.score10 # type: ignore
-    archer.score8 = update.score8 # type: ignore
-    archer.score6 = update.score6 # type: ignore
-    archer.score4 = update.score4 # type: ignore
-    archer.score0 = update.score0 # type: ignore
 
-    db.commit()
-    db.refresh(archer)
+    hot_logger.debug("updating scores of %s %s: %s", update.first_name, update.last_name, update)
+
+    # only the fields the client sent are written
+    values: Dict[str, Any] = update.model_dump(exclude_unset=True, include=set(ARCHER_PATCH_FIELDS))
+    return commit_archer_write(db, archer_id, values, update.version, idempotency_key, scope, payload_hash)
+
+
+@app.patch("/archers/{archer_id}", response_model=ArcherOut)
+def patch_archer(
+    archer_id: int,
+    patch: ArcherPatch,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Response:
+    scope: str = f"{request.method} {request.url.path}"
+    payload_hash: str = request_hash(patch.model_dump(mode="json", exclude_unset=True))
+    replayed: Optional[Response] = replay(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    values: Dict[str, Any] = patch.model_dump(exclude_unset=True, include=set(ARCHER_PATCH_FIELDS))
+    return commit_archer_write(db, archer_id, values, patch.version, idempotency_key, scope, payload_hash)
+
+
+@app.post("/competitions/{competition_id}/scores/batch", response_model=ScoreBatchResult)
+def update_archer_scores_batch(
+    competition_id: int,
+    updates: List[ArcherScoreBatchItem],
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Response:
+    scope: str = f"{request.method} {request.url.path}"
+    payload_hash: str = request_hash([item.model_dump(mode="json", exclude_unset=True) for item in updates])
+    replayed: Optional[Response] = replay(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    requested_ids: List[int] = [item.archer_id for item in updates]
+
+    # resolve all archers of the batch with a single query
+    known_ids: Set[int] = {
+        archer_id for (archer_id,) in db.query(Archer.id).filter(
+            Archer.competition_id == competition_id,
+            Archer.id.in_(requested_ids)
+        ).all()
+    }
+
+    scored_ids: Set[int] = {
+        archer_id for (archer_id,) in db.query(ScoreEntry.archer_id).filter(ScoreEntry.archer_id.in_(known_ids)).distinct()
+    } if known_ids else set()
+
+    shapes: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    errors: List[ScoreBatchError] = []
+    seen: Set[int] = set()
+
+    for item in updates:
+        if item.archer_id not in known_ids:
+            errors.append(ScoreBatchError(archer_id=item.archer_id, detail="Archer not found"))
+            continue
+        if item.archer_id in scored_ids:
+            errors.append(ScoreBatchError(archer_id=item.archer_id, detail=SCORED_PER_TARGET))
+            continue
+        if item.archer_id in seen:
+            errors.append(ScoreBatchError(archer_id=item.archer_id, detail="Duplicate archer in batch"))
+            continue
+
+        seen.add(item.archer_id)
+        # like the single updates, scores the client did not send are left alone
+        scores: Dict[str, Optional[int]] = item.model_dump(exclude_unset=True, include=set(SCORE_VALUES))
+        shapes.setdefault(tuple(sorted(scores)), []).append({"id": item.archer_id, **scores})
+
+    # apply all valid updates in one transaction, one executemany UPDATE per set of sent fields,
+    # then recompute the totals from the updated hit counts
+    for rows in shapes.values():
+        db.execute(update(Archer).values(version=Archer.version + 1), rows)
+    if seen:
+        db.execute(update(Archer).values(total_score=Archer.total_score_expression()), [{"id": archer_id} for archer_id in seen])
+
+    updated: List[Archer] = db.query(Archer).filter(Archer.id.in_(seen)).all() if seen else []
+    body: bytes = ScoreBatchResult(
+        updated=[ArcherOut.model_validate(archer) for archer in updated],
+        errors=errors,
+    ).model_dump_json().encode()
+    remember(db, idempotency_key, scope, payload_hash, body)
+
+    replayed = commit(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    if seen:
+        result_cache.invalidate(competition_id)
+    for archer in updated:
+        publish_archer_update(db, "updated", archer)
+
+    return Response(content=body, media_type="application/json")
+
+
+@app.post("/archers/{archer_id}/scores", response_model=ScoreEntryOut)
+def add_score_entry(
+    archer_id: int,
+    entry_in: ScoreEntryCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Any:
+    scope: str = f"{request.method} {request.url.path}"
+    payload_hash: str = request_hash(entry_in.model_dump(mode="json"))
+    replayed: Optional[Response] = replay(db, idempotency_key, scope, payload_hash)
+    if replayed is not None:
+        return replayed
+
+    if entry_in.value not in SCORE_VALUES.values():
+        raise HTTPException(status_code=400, detail=f"value must be one of {', '.join(map(str, SCORE_VALUES.values()))}")
+
+    comp_id: Optional[int] = db.query(Archer.competition_id).filter(Archer.id == archer_id).scalar()
+    if comp_id is None:
+        raise HTTPException(status_code=404, detail="Archer not found")
+
+    # increment the archer's aggregates in the same transaction instead of rewriting the scorecard,
+    # unless they come from a scorecard the entries would not add up with
+    hit_count = getattr(Archer, f"score{entry_in.value}")
+    incremented = db.execute(update(Archer).where(
+        Archer.id == archer_id,
+        or_(
+            select(ScoreEntry.id).where(ScoreEntry.archer_id == archer_id).exists(),
+            and_(*(func.coalesce(getattr(Archer, field), 0) == 0 for field in SCORE_VALUES)),
+        ),
+    ).values({
+        hit_count: func.coalesce(hit_count, 0) + 1,
+        Archer.total_score: Archer.total_score + entry_in.value,
+        Archer.version: Archer.version + 1,
+    }))
+    if not incremented.rowcount:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=SCORED_BY_SCORECARD)
+
+    entry = ScoreEntry(archer_id=archer_id, target=entry_in.target, value=entry_in.value)
+    db.add(entry)
+
+    try:
+        db.flush()
+        remember(db, idempotency_key, scope, payload_hash, ScoreEntryOut.model_validate(entry).model_dump_json().encode())
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # a retry that raced its original request gets that request's entry instead of the conflict
+        replayed = replay(db, idempotency_key, scope, payload_hash)
+        if replayed is not None:
+            return replayed
+        raise HTTPException(status_code=409, detail=f"Target {entry_in.target} is already scored for this archer")
+    db.refresh(entry)
+
+    result_cache.invalidate(comp_id)
+    if live_hub.has_subscribers(comp_id):
+        publish_archer_update(db, "updated", db.get(Archer, archer_id))  # type: ignore
+
+    return entry
+
+
+@app.get("/archers/{archer_id}/scores", response_model=List[ScoreEntryOut])
+def get_score_entries(
+    archer_id: int,
+    db: Session = Depends(get_db)
+) -> List[ScoreEntry]:
+    return db.query(ScoreEntry).filter(ScoreEntry.archer_id == archer_id).order_by(ScoreEntry.target).all()
 
-    return archer
+
+@app.get("/competitions/{competition_id}/progress", response_model=List[TargetProgressOut])
+def get_target_progress(
+    competition_id: int,
+    db: Session = Depends(get_db)
+) -> List[TargetProgressOut]:
+    rows = (
+        db.query(Archer.id, func.count(ScoreEntry.id), func.max(ScoreEntry.target))
+        .outerjoin(ScoreEntry, ScoreEntry.archer_id == Archer.id)
+        .filter(Archer.competition_id == competition_id)
+        .group_by(Archer.id)
+        .all()
+    )
+
+    return [
+        TargetProgressOut(archer_id=archer_id, targets_shot=targets_shot, last_target=last_target)
+        for archer_id, targets_shot, last_target in rows
+    ]
 
 
 @app.delete("/archers/{archer_id}", response_model=ArcherOut)
 def delete_archer(
     archer_id: int, 
     db: Session = Depends(get_db)
-) -> ArcherOut:
-    archer: Optional[Archer] = db.query(Archer).filter(Archer.id == archer_id).first()
-    
-    if not archer:
+) -> Dict[str, Any]:
+    # bulk statements bypass the ORM cascade, so the score entries are removed explicitly
+    db.execute(delete(ScoreEntry).where(ScoreEntry.archer_id == archer_id))
+    unindex_archers(db, [archer_id])
+    row = db.execute(delete(Archer).where(Archer.id == archer_id).returning(*ARCHER_OUT_COLUMNS)).first()
+
+    if row is None:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Archer not found")
 
-    db.delete(archer)
     db.commit()
-    return archer
+    result_cache.invalidate(row.competition_id)
+    live_hub.publish(row.competition_id, "deleted", {"archer_id": archer_id})
+    return row._asdict()
 
 
 @app.post("/archers/clear_score/{archer_id}", response_model=ArcherOut)
 def clear_archer_score(
     archer_id: int,
     db: Session = Depends(get_db)
-) -> ArcherOut:
-    archer: Optional[Archer] = db.query(Archer).filter(Archer.id == archer_id).first()
+) -> Dict[str, Any]:
+    row = db.execute(
+        update(Archer).where(Archer.id == archer_id).values(**CLEARED_SCORES).returning(*ARCHER_OUT_COLUMNS),
+        execution_options={"synchronize_session": False},
+    ).first()
 
-    if not archer:
+    if row is None:
         raise HTTPException(status_code=404, detail="Archer not found")
-    
-    archer.score20 = None # type: ignore
-    archer.score18 = None # type: ignore
-    archer.score16 = None # type: ignore
-    archer.score14 = None # type: ignore
-    archer.score12 = None # type: ignore
-    archer.score10 = None # type: ignore
-    archer.score8 = None # type: ignore
-    archer.score6 = None # type: ignore
-    archer.score4 = None # type: ignore
-    archer.score0 = None # type: ignore
+
+    # per-target history goes together with the aggregates
+    db.execute(delete(ScoreEntry).where(ScoreEntry.archer_id == archer_id))
 
     db.commit()
-    db.refresh(archer)
-    return archer
+    result_cache.invalidate(row.competition_id)
+    publish_archer_update(db, "updated", row)
+    return row._asdict()
 
 
 @app.post("/archers/clear_scores/{competition_id}")
@@ -214,34 +553,78 @@ def clear_all_archer_scores(
         comp_id = int(competition_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="competition_id must be an integer")
-    
-    archers: List[Archer] = db.query(Archer).filter(Archer.competition_id == comp_id).all()
 
-    if not archers:
+    # a single UPDATE for the whole competition, no archers are loaded into the session
+    updated = db.execute(update(Archer).where(Archer.competition_id == comp_id).values(**CLEARED_SCORES))
+
+    if not updated.rowcount:
         raise HTTPException(status_code=404, detail="No archers found")
-    
-    for archer in archers:
-        archer.score20 = None # type: ignore
-        archer.score18 = None # type: ignore
-        archer.score16 = None # type: ignore
-        archer.score14 = None # type: ignore
-        archer.score12 = None # type: ignore
-        archer.score10 = None # type: ignore
-        archer.score8 = None # type: ignore
-        archer.score6 = None # type: ignore
-        archer.score4 = None # type: ignore
-        archer.score0 = None # type: ignore
+
+    # per-target history goes together with the aggregates
+    db.execute(delete(ScoreEntry).where(
+        ScoreEntry.archer_id.in_(select(Archer.id).where(Archer.competition_id == comp_id))
+    ))
 
     db.commit()
-    db.close()
-    return {"message": f"Cleared scores for {len(archers)} archers"}
+    result_cache.invalidate(comp_id)
+    live_hub.publish(comp_id, "cleared", {})
+    return {"message": f"Cleared scores for {updated.rowcount} archers"}
+
+
+@app.delete("/competitions/{competition_id}/archers")
+def delete_archers(
+    competition_id: int,
+    club: Optional[str] = None,
+    bow_category: Optional[Category] = None,
+    gender: Optional[Gender] = None,
+    age_group: Optional[AgeGroup] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, int]:
+    # without filters every archer of the competition is removed
+    archer_ids = apply_archer_filters(select(Archer.id), competition_id, club, bow_category, gender, age_group)
+
+    db.execute(delete(ScoreEntry).where(ScoreEntry.archer_id.in_(archer_ids)))
+    unindex_selected(db, archer_ids)
+    deleted = db.execute(delete(Archer).where(Archer.id.in_(archer_ids))).rowcount
+
+    db.commit()
+    if deleted:
+        result_cache.invalidate(competition_id)
+        live_hub.publish(competition_id, "deleted", {"count": deleted})
+    return {"deleted": deleted}
+
+
+@app.post("/competitions/{competition_id}/archers/division")
+def reassign_division(
+    competition_id: int,
+    reassign: DivisionReassign,
+    club: Optional[str] = None,
+    bow_category: Optional[Category] = None,
+    gender: Optional[Gender] = None,
+    age_group: Optional[AgeGroup] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, int]:
+    values = reassign.model_dump(include={"category", "gender", "age_group"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to reassign")
+
+    statement = apply_archer_filters(select(Archer.id), competition_id, club, bow_category, gender, age_group)
+    if reassign.archer_ids is not None:
+        statement = statement.where(Archer.id.in_(reassign.archer_ids))
+
+    updated = db.execute(update(Archer).where(Archer.id.in_(statement)).values(**values, version=Archer.version + 1)).rowcount
+
+    db.commit()
+    if updated:
+        result_cache.invalidate(competition_id)
+        live_hub.publish(competition_id, "reassigned", {"count": updated})
+    return {"updated": updated}
 
 
 @app.get("/archer/{competition_id}/{archer_id}", response_model=ArcherOut)
-def get_archer(
+async def get_archer(
     competition_id: str,
-    archer_id: str,
-    db: Session = Depends(get_db)
+    archer_id: str
 ) -> Archer:
     try:
         comp_id = int(competition_id)
@@ -249,78 +632,136 @@ def get_archer(
     except ValueError:
         raise HTTPException(status_code=400, detail="competition_id and archer_id must be integers")
 
-    archer = db.query(Archer).filter(
+    archers: List[Archer] = await fetch_scalars(select(Archer).where(
         Archer.competition_id == comp_id,
         Archer.id == arch_id
-    ).first()
+    ))
 
-    if not archer:
+    if not archers:
         raise HTTPException(status_code=404, detail="Archer not found")
 
-    return archer
+    return archers[0]
 
 
 @app.get("/archers/{competition_id}", response_model=List[ArcherOut])
-def get_archers(
+async def get_archers(
     competition_id: str, 
-    db: Session = Depends(get_db)
-) -> List[Archer]:
+    request: Request
+) -> Response:
     try:
         comp_id = int(competition_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="competition_id must be an integer")
-    
-    return db.query(Archer).filter(Archer.competition_id == comp_id).all()
+
+    async def build() -> bytes:
+        rows = await fetch_all(select(*ARCHER_OUT_COLUMNS).where(Archer.competition_id == comp_id))
+        return dumps(archer_rows(rows))
+
+    return await result_cache.respond(request, comp_id, ("archers",), build)
 
 
 @app.get("/archers/filter/{competition_id}", response_model=List[ArcherOut])
-def get_archers_filtered(
+async def get_archers_filtered(
     competition_id: str,
+    request: Request,
     club: Optional[str] = Query(None),              # optional query parameter
     bow_category: Optional[Category] = Query(None), # optional query parameter
     gender: Optional[Gender] = Query(None),         # optional query parameter
     age_group: Optional[AgeGroup] = Query(None),    # optional query parameter
-    sort: Optional[str] = Query(None, regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
-) -> List[Archer]:
+    sort: Optional[str] = Query(None, regex="^(asc|desc)$")
+) -> Response:
     try:
         comp_id = int(competition_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="competition_id must be an integer")
-    
-    query: SAQuery[Archer] = db.query(Archer).filter(Archer.competition_id == comp_id) # type: ignore
 
-    # apply optional filters
-    if club is not None:
-        query = query.filter(Archer.club == club)
-    if bow_category is not None:
-        query = query.filter(Archer.category == bow_category)
-    if gender is not None:
-        query = query.filter(Archer.gender == gender)
-    if age_group is not None:
-        query = query.filter(Archer.age_group == age_group)
-
-    # sorting
-    total_score_expr = (
-        func.coalesce(Archer.score20, 0) * 20 +
-        func.coalesce(Archer.score18, 0) * 18 +
-        func.coalesce(Archer.score16, 0) * 16 +
-        func.coalesce(Archer.score14, 0) * 14 +
-        func.coalesce(Archer.score12, 0) * 12 +
-        func.coalesce(Archer.score10, 0) * 10 +
-        func.coalesce(Archer.score8, 0) * 8 +
-        func.coalesce(Archer.score6, 0) * 6 +
-        func.coalesce(Archer.score4, 0) * 4 +
-        func.coalesce(Archer.score0, 0) * 0    # safe no-op, but keeps consistency
-    ).label('total_score')
-
-    if sort == "asc":
-        query = query.order_by(asc(total_score_expr))
-    elif sort == "desc":
-        query = query.order_by(desc(total_score_expr))
-    
-    archers: List[Archer] = query.all()
-    return archers
+    async def build() -> bytes:
+        query = apply_archer_filters(select(*ARCHER_OUT_COLUMNS), comp_id, club, bow_category, gender, age_group)
+
+        # sorting (total score, ties broken by number of 20s and 18s)
+        if sort == "asc":
+            query = query.order_by(asc(Archer.total_score), asc(Archer.score20), asc(Archer.score18))
+        elif sort == "desc":
+            query = query.order_by(desc(Archer.total_score), desc(Archer.score20), desc(Archer.score18))
+
+        return dumps(archer_rows(await fetch_all(query)))
+
+    key = ("archers/filter", club, bow_category, gender, age_group, sort)
+    return await result_cache.respond(request, comp_id, key, build)
+
+
+@app.get("/archers/search/{competition_id}", response_model=List[ArcherOut])
+async def search_archers(
+    competition_id: int,
+    q: str = Query(..., min_length=1),              # part of a name, club or email
+    limit: int = Query(20, ge=1, le=100)
+) -> Response:
+    # not cached: every keystroke at the registration desk is a different query
+    statement = search_statement(ARCHER_OUT_COLUMNS, competition_id, q, limit, engine.dialect.name)
+    rows: List[Any] = await fetch_all(statement) if statement is not None else []
+    return Response(content=dumps(archer_rows(rows)), media_type="application/json")
+
+
+@app.get("/archers/page/{competition_id}", response_model=ArcherPage)
+async def get_archers_page(
+    competition_id: int,
+    request: Request,
+    club: Optional[str] = Query(None),              # optional query parameter
+    bow_category: Optional[Category] = Query(None), # optional query parameter
+    gender: Optional[Gender] = Query(None),         # optional query parameter
+    age_group: Optional[AgeGroup] = Query(None),    # optional query parameter
+    sort: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),            # next_cursor of the previous page
+    fields: Optional[str] = Query(None)             # comma-separated ArcherOut fields, all if omitted
+) -> Response:
+    # projection: only the requested columns are selected, id is always included
+    field_names: List[str] = list(ARCHER_COLUMNS) if fields is None else ["id", *(
+        name.strip() for name in fields.split(",") if name.strip() and name.strip() != "id"
+    )]
+    unknown: List[str] = [name for name in field_names if name not in ARCHER_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    # keyset over the sorted score order, ties broken by id so every row has a unique position
+    if sort is None:
+        sort_key = [Archer.id]
+    else:
+        sort_key = [Archer.total_score, func.coalesce(Archer.score20, 0), func.coalesce(Archer.score18, 0), Archer.id]
+
+    async def build() -> bytes:
+        query = apply_archer_filters(
+            select(*(ARCHER_COLUMNS[name] for name in field_names), *(column.label(f"_key{i}") for i, column in enumerate(sort_key))),
+            competition_id, club, bow_category, gender, age_group
+        )
+
+        if cursor is not None:
+            after: List[Any] = decode_cursor(cursor)
+            if len(after) != len(sort_key):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            position = tuple_(*sort_key)
+            query = query.where(position < tuple_(*after) if sort == "desc" else position > tuple_(*after))
+
+        if sort == "desc":
+            query = query.order_by(*(desc(column) for column in sort_key))
+        else:
+            query = query.order_by(*sort_key)
+
+        # fetch one extra row to know whether there is a next page
+        rows = await fetch_all(query.limit(limit + 1))
+        page = rows[:limit]
+
+        next_cursor: Optional[str] = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([page[-1]._mapping[f"_key{i}"] for i in range(len(sort_key))])
+
+        return dumps({
+            "items": [{name: row._mapping[name] for name in field_names} for row in page],
+            "next_cursor": next_cursor,
+        })
+
+    key = ("archers/page", club, bow_category, gender, age_group, sort, limit, cursor, tuple(field_names))
+    return await result_cache.respond(request, competition_id, key, build)
 
 
 @app.post("/archers", response_model=ArcherOut)
@@ -333,7 +774,7 @@ def create_archer(
     except ValueError:
         raise HTTPException(status_code=400, detail="competition must be an integer")
 
-    print("Creating archer:", archer_in)    
+    hot_logger.debug("creating archer: %s", archer_in)
 
     new_archer = Archer(
         first_name=archer_in.first_name,
@@ -357,62 +798,121 @@ def create_archer(
     )
 
     db.add(new_archer)
-    db.commit()
+    try:
+        db.flush()
+        index_archers(db, [new_archer])
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Archer already exists in this competition")
     db.refresh(new_archer)
+    result_cache.invalidate(comp_id)
+    publish_archer_update(db, "created", new_archer)
 
     return new_archer
 
 
 # ----------------------------
-# LEADERBOARDS
+# LIVE UPDATES
 # ----------------------------
-@app.get("/leaderboards/category", response_model=Dict[str, List[ArcherOut]])
-def get_category_leaderboards(db: Session = Depends(get_db)) -> Dict[str, List[ArcherOut]]:
-    leaderboard = {}
-    for category in Category:
-        archers_in_category = (
-            db.query(Archer)
-            .filter(Archer.category == category, Archer.score != None)
-            .order_by(desc(Archer.score))
-            .all()
-        )
+@app.get("/competitions/{competition_id}/live")
+async def stream_competition_updates(
+    competition_id: int,
+    request: Request
+) -> StreamingResponse:
+    async def events() -> AsyncIterator[str]:
+        async with live_hub.subscribe(competition_id) as queue:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # comment frame keeps proxies and idle connections open
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        if not archers_in_category:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"No archers with scores found in category '{category.value}'"
-            )
 
-        leaderboard[category.value] = archers_in_category
-    
-    return leaderboard
-
-
-@app.get("/leaderboards/age_group", response_model=Dict[str, List[ArcherOut]])
-def get_age_group_leaderboards(db: Session = Depends(get_db)) -> Dict[str, List[ArcherOut]]:
-    leaderboard = {}
-    for age_group in AgeGroup:
-        archers_in_age_group = (
-            db.query(Archer)
-            .filter(Archer.age_group == age_group, Archer.score != None)
-            .order_by(desc(Archer.score))
-            .all()
+# ----------------------------
+# LEADERBOARDS
+# ----------------------------
+@app.get("/leaderboards/{competition_id}", response_model=List[DivisionLeaderboard])
+async def get_competition_leaderboard(
+    competition_id: int,
+    request: Request
+) -> Response:
+    async def build() -> bytes:
+        if not await fetch_scalars(select(Competition.id).where(Competition.id == competition_id)):
+            raise HTTPException(status_code=404, detail="Competition not found")
+
+        # places are assigned by the database, per division, with ties broken by number of 20s and 18s
+        place = func.rank().over(
+            partition_by=(Archer.category, Archer.gender, Archer.age_group),
+            order_by=(
+                desc(Archer.total_score),
+                desc(func.coalesce(Archer.score20, 0)),
+                desc(func.coalesce(Archer.score18, 0)),
+            ),
+        ).label("place")
+
+        rows = await fetch_all(
+            select(*ARCHER_OUT_COLUMNS, place)
+            .where(Archer.competition_id == competition_id)
+            .order_by(Archer.category, Archer.gender, Archer.age_group, place, Archer.last_name, Archer.first_name)
         )
 
-        if not archers_in_age_group:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"No archers with scores found in age group '{age_group.value}'"
-            )
+        # rows arrive ordered by division, so they only need to be split into groups
+        leaderboard: List[Dict[str, Any]] = []
+        for (category, gender, age_group), division_rows in groupby(rows, key=lambda row: (row.category, row.gender, row.age_group)):
+            leaderboard.append({
+                "category": category,
+                "gender": gender,
+                "age_group": age_group,
+                "archers": archer_rows(list(division_rows)),
+            })
 
-        leaderboard[age_group.value] = archers_in_age_group
-    
-    return leaderboard
+        return dumps(leaderboard)
+
+    return await result_cache.respond(request, competition_id, ("leaderboard",), build)
 
 
 # ----------------------------
 # COMPETITIONS
 # ----------------------------
+@app.get("/competitions/{competition_id}/export")
+def export_competition_results(
+    competition_id: int,
+    format: str = Query("csv", pattern="^(csv|xlsx|pdf)$"),
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    competition: Optional[Competition] = db.query(Competition).filter(Competition.id == competition_id).first()
+    if competition is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    from export import EXPORT_FORMATS, stream_csv, stream_pdf, stream_xlsx
+
+    try:
+        if format == "csv":
+            content = stream_csv(competition_id)
+        elif format == "xlsx":
+            content = stream_xlsx(competition_id)
+        else:
+            content = stream_pdf(competition_id, str(competition.name))
+    except ImportError:
+        raise HTTPException(status_code=501, detail=f"{format} export is not available in this installation")
+
+    filename: str = f"{sanitize_string(str(competition.name))}_results.{format}"
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @app.post("/competitions")
 def create_competition(
     name: str = Form(...),
@@ -435,16 +935,16 @@ def create_competition(
 
 
 @app.get("/competitions", response_model=List[CompetitionOut])
-def get_competitions(db: Session = Depends(get_db)):
-    return db.query(Competition).all()
+async def get_competitions():
+    return await fetch_scalars(select(Competition))
 
 
 @app.get("/competitions/{competition_id}", response_model=CompetitionOut)
-def get_competition(competition_id: int, db: Session = Depends(get_db)):
-    competition: Optional[Competition] = db.query(Competition).filter(Competition.id == competition_id).first()
-    if competition is None:
+async def get_competition(competition_id: int):
+    competitions: List[Competition] = await fetch_scalars(select(Competition).where(Competition.id == competition_id))
+    if not competitions:
         raise HTTPException(status_code=404, detail="Competition not found")
-    return competition
+    return competitions[0]
 
 
 @app.post("/competitions/logo/{competition_id}", response_model=CompetitionOut)
@@ -465,7 +965,114 @@ def upload_competition_logo(
     return competition
 
 
+
+# ----------------------------
+# SEASONS
+# ----------------------------
+@app.post("/seasons", response_model=SeasonOut)
+def create_season(
+    season_in: SeasonCreate,
+    db: Session = Depends(get_db)
+) -> Season:
+    new_season = Season(name=season_in.name, best_of=season_in.best_of)
+    db.add(new_season)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Season already exists")
+    db.refresh(new_season)
+    return new_season
+
+
+@app.get("/seasons", response_model=List[SeasonOut])
+async def get_seasons():
+    return await fetch_scalars(select(Season))
+
+
+@app.post("/seasons/{season_id}/competitions/{competition_id}", response_model=CompetitionOut)
+def add_competition_to_season(
+    season_id: int,
+    competition_id: int,
+    db: Session = Depends(get_db)
+) -> Competition:
+    season: Optional[Season] = db.query(Season).filter(Season.id == season_id).first()
+    competition: Optional[Competition] = db.query(Competition).filter(Competition.id == competition_id).first()
+    if season is None or competition is None:
+        raise HTTPException(status_code=404, detail="Season or competition not found")
+
+    if competition.season_id is not None and competition.season_id != season.id:
+        from standings import withdraw_competition
+
+        # results finalized in the previous season no longer count there
+        withdraw_competition(db, competition.season, competition.id)  # type: ignore
+
+    competition.season_id = season.id  # type: ignore
+    db.commit()
+    db.refresh(competition)
+    return competition
+
+
+@app.post("/competitions/{competition_id}/finalize")
+def finalize_competition_scores(
+    competition_id: int,
+    db: Session = Depends(get_db)
+) -> Dict[str, int]:
+    competition: Optional[Competition] = db.query(Competition).filter(Competition.id == competition_id).first()
+    if competition is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+    if competition.season_id is None:
+        raise HTTPException(status_code=400, detail="Competition is not part of a season")
+
+    from standings import finalize_competition
+
+    updated: int = finalize_competition(db, competition)
+    db.commit()
+    return {"standings_updated": updated}
+
+
+@app.get("/seasons/{season_id}/standings", response_model=List[StandingOut])
+async def get_season_standings(
+    season_id: int,
+    bow_category: Optional[Category] = Query(None), # optional query parameter
+    gender: Optional[Gender] = Query(None),         # optional query parameter
+    age_group: Optional[AgeGroup] = Query(None)     # optional query parameter
+) -> Response:
+    place = func.rank().over(
+        partition_by=(SeasonStanding.category, SeasonStanding.gender, SeasonStanding.age_group),
+        order_by=desc(SeasonStanding.points),
+    ).label("place")
+
+    query = select(
+        place, SeasonStanding.archer_key, SeasonStanding.first_name, SeasonStanding.last_name, SeasonStanding.club,
+        SeasonStanding.category, SeasonStanding.gender, SeasonStanding.age_group,
+        SeasonStanding.points, SeasonStanding.events_counted, SeasonStanding.events_shot,
+    ).where(SeasonStanding.season_id == season_id)
+
+    if bow_category is not None:
+        query = query.where(SeasonStanding.category == bow_category)
+    if gender is not None:
+        query = query.where(SeasonStanding.gender == gender)
+    if age_group is not None:
+        query = query.where(SeasonStanding.age_group == age_group)
+
+    rows = await fetch_all(query.order_by(
+        SeasonStanding.category, SeasonStanding.gender, SeasonStanding.age_group, place, SeasonStanding.last_name
+    ))
+    # an empty result needs a second look to tell an unscored season from a missing one
+    if not rows and not await fetch_scalars(select(Season.id).where(Season.id == season_id)):
+        raise HTTPException(status_code=404, detail="Season not found")
+    return Response(content=dumps([row._asdict() for row in rows]), media_type="application/json")
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    # run uvicorn programmatically (good for freezing)
-    uvicorn.run(app, host="127.0.0.1", port=port, log_level="info")
\ No newline at end of file
+    if BACKEND_WORKERS > 1:
+        # prepare the schema once here, the workers' startup events then only find the stamp
+        prepare_database(engine)
+        coordination.clear_subscribers()
+        # every worker process imports the app itself, shared state goes through the coordination backend
+        uvicorn.run("app:app", host=BACKEND_HOST, port=port, workers=BACKEND_WORKERS, log_level="info")
+    else:
+        # run uvicorn programmatically (good for freezing)
+        uvicorn.run(app, host=BACKEND_HOST, port=port, log_level="info")
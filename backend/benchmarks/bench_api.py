@@ -0,0 +1,240 @@
+"""
+End-to-end benchmark of the API through an in-process TestClient against a fresh SQLite database.
+
+Scenarios: CSV import, full and filtered/sorted listing, keyset paging, score-update bursts,
+leaderboards and clearing scores. Every scenario reports p50/p95/p99 latency and throughput;
+the process' peak RSS is recorded after each one.
+
+Run from the backend directory:
+    python -m benchmarks.bench_api --rows 1000 --output results.json
+    python -m benchmarks.bench_api --rows 1000 --baseline results.json --threshold 0.2
+
+With --baseline the run exits with status 1 if the p95 latency of any scenario grew by more
+than the threshold, so results of two commits can be compared on the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None  # type: ignore
+
+from benchmarks.generate_csv import SIZES, generate_csv_bytes
+
+SCORE_FIELDS = ("score20", "score18", "score16", "score14", "score12", "score10", "score8", "score6", "score4", "score0")
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index: int = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings: List[float], elapsed: float) -> Dict[str, Any]:
+    ordered: List[float] = sorted(timings)
+    return {
+        "requests": len(timings),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_scenario(name: str, calls: List[Callable[[], Any]], before_each: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    timings: List[float] = []
+    started: float = time.perf_counter()
+    for call in calls:
+        if before_each is not None:
+            before_each()
+        start: float = time.perf_counter()
+        response = call()
+        timings.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{name}: {response.status_code} {response.text[:200]}")
+    result = summarize(timings, time.perf_counter() - started)
+    print(f"{name:<18} p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+          f"p99 {result['p99_ms']:9.2f} ms  {result['throughput_rps']:9.1f} req/s")
+    return result
+
+
+def run(rows: int, requests: int, seed: int) -> Dict[str, Any]:
+    # the app reads its configuration at import time, point it at a throwaway database first
+    directory: str = tempfile.mkdtemp(prefix="archery-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from fastapi.testclient import TestClient
+    from app import app
+    from cache import result_cache
+
+    rng = random.Random(seed)
+    scenarios: Dict[str, Any] = {}
+    csv_bytes: bytes = generate_csv_bytes(rows, seed)
+
+    with TestClient(app) as client:
+        client.post("/competitions", data={"name": "Benchmark", "date": "2025-08-23", "location": "Bench"})
+        comp_id: int = client.get("/competitions").json()[-1]["id"]
+
+        def upload() -> Any:
+            return client.post(
+                "/archers/upload",
+                files={"file": ("archers.csv", csv_bytes, "text/csv")},
+                data={"competition_id": str(comp_id), "language": "sl"},
+            )
+
+        scenarios["import"] = run_scenario("import", [upload])
+        scenarios["import"]["rows_per_second"] = round(rows / (scenarios["import"]["mean_ms"] / 1000), 1)
+        # a second upload of the same file only finds duplicates
+        scenarios["reimport"] = run_scenario("reimport", [upload])
+
+        archers: List[Dict[str, Any]] = client.get(f"/archers/{comp_id}").json()
+
+        def invalidate() -> None:
+            result_cache.invalidate(comp_id)
+
+        scenarios["list_cached"] = run_scenario(
+            "list_cached", [lambda: client.get(f"/archers/{comp_id}")] * requests,
+        )
+        scenarios["list"] = run_scenario(
+            "list", [lambda: client.get(f"/archers/{comp_id}")] * requests, before_each=invalidate,
+        )
+
+        filters: List[Dict[str, str]] = [
+            {"gender": "male", "bow_category": "long bow", "sort": "desc"},
+            {"gender": "female", "age_group": "adults", "sort": "asc"},
+            {"club": "Šentlok", "sort": "desc"},
+            {"age_group": "U15", "bow_category": "barebow", "sort": "desc"},
+        ]
+        scenarios["filter_sorted"] = run_scenario(
+            "filter_sorted",
+            [lambda params=params: client.get(f"/archers/filter/{comp_id}", params=params)
+             for params in (filters[i % len(filters)] for i in range(requests))],
+            before_each=invalidate,
+        )
+
+        def walk_pages() -> Any:
+            response = client.get(f"/archers/page/{comp_id}", params={"sort": "desc", "limit": 100})
+            while response.json()["next_cursor"] is not None:
+                response = client.get(f"/archers/page/{comp_id}", params={
+                    "sort": "desc", "limit": 100, "cursor": response.json()["next_cursor"],
+                })
+            return response
+
+        scenarios["page_walk"] = run_scenario("page_walk", [walk_pages] * max(1, requests // 20))
+
+        def score_update(archer: Dict[str, Any]) -> Callable[[], Any]:
+            return lambda: client.post("/archers/score", json={
+                "first_name": archer["first_name"],
+                "last_name": archer["last_name"],
+                "club": archer["club"],
+                "competition_id": comp_id,
+                "category": archer["category"],
+                "gender": archer["gender"],
+                "age_group": archer["age_group"],
+                **{field: rng.randint(0, 3) for field in SCORE_FIELDS},
+            })
+
+        scenarios["score_burst"] = run_scenario(
+            "score_burst", [score_update(rng.choice(archers)) for _ in range(requests)],
+        )
+
+        def score_batch() -> Any:
+            return client.post(f"/competitions/{comp_id}/scores/batch", json=[
+                {"archer_id": archer["id"], **{field: rng.randint(0, 3) for field in SCORE_FIELDS}}
+                for archer in rng.sample(archers, min(50, len(archers)))
+            ])
+
+        scenarios["score_batch"] = run_scenario("score_batch", [score_batch] * max(1, requests // 10))
+
+        scenarios["leaderboard"] = run_scenario(
+            "leaderboard", [lambda: client.get(f"/leaderboards/{comp_id}")] * requests, before_each=invalidate,
+        )
+        scenarios["clear"] = run_scenario(
+            "clear", [lambda: client.post(f"/archers/clear_scores/{comp_id}")] * max(1, requests // 20),
+        )
+
+    return {
+        "rows": rows,
+        "requests": requests,
+        "seed": seed,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "peak_rss_mb": peak_rss_mb(),
+        "scenarios": scenarios,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    if baseline.get("rows") != result["rows"]:
+        print(f"warning: baseline was recorded with {baseline.get('rows')} rows, this run used {result['rows']}")
+
+    regressions: List[str] = []
+    for name, current in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        change: float = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        print(f"{name:<18} p95 {previous['p95_ms']:9.2f} -> {current['p95_ms']:9.2f} ms  ({change:+.0%})")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000, help=f"registrations to import, e.g. {SIZES}")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 increase")
+    args = parser.parse_args()
+
+    result: Dict[str, Any] = run(args.rows, args.requests, args.seed)
+    print(f"peak RSS: {result['peak_rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline: Dict[str, Any] = json.load(file)
+        regressions: List[str] = find_regressions(result, baseline, args.threshold)
+        if regressions:
+            print(f"p95 regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Micro-benchmark of parse_category per registration row.
+
+Run from the backend directory:
+    python -m benchmarks.bench_parse [rows]
+"""
+import csv
+import os
+import sys
+import time
+from typing import List
+
+from models import Language
+from parse import _parse_normalized_category, parse_category
+
+REPO_ROOT: str = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_FILES = ("archers.csv", "PTL_Lemberg_2025_seznam - List1.csv")
+
+
+def load_sample_values() -> List[str]:
+    values: List[str] = []
+    for name in SAMPLE_FILES:
+        with open(os.path.join(REPO_ROOT, name), encoding="utf-8") as file:
+            values.extend(row["Slog"] for row in csv.DictReader(file))
+    return values
+
+
+def per_row_ns(values: List[str], rows: int, memoized: bool) -> float:
+    start: int = time.perf_counter_ns()
+    for i in range(rows):
+        if not memoized:
+            _parse_normalized_category.cache_clear()
+        parse_category(values[i % len(values)], Language.SL)
+    return (time.perf_counter_ns() - start) / rows
+
+
+def main() -> None:
+    rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    values: List[str] = load_sample_values()
+
+    print(f"{len(values)} sample values, {len(set(values))} distinct, {rows} rows")
+    print(f"uncached: {per_row_ns(values, rows, memoized=False):8.0f} ns/row")
+    _parse_normalized_category.cache_clear()
+    print(f"memoized: {per_row_ns(values, rows, memoized=True):8.0f} ns/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares the ORM + Pydantic serialization of archer lists with the Core select + dumps path
+used by the read endpoints.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialize [archers]
+"""
+import random
+import sys
+import time
+from typing import Any, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from models import AgeGroup, Archer, Base, Category, Competition, Gender, SCORE_VALUES, compute_total_score
+from schemas import ArcherOut
+from serialization import dumps, orjson
+
+ARCHER_OUT_COLUMNS: List[Any] = [getattr(Archer, name) for name in ArcherOut.model_fields]
+archer_list_adapter: TypeAdapter[List[ArcherOut]] = TypeAdapter(List[ArcherOut])
+
+
+def populate(session: Session, archers: int) -> None:
+    session.add(Competition(id=1, name="Benchmark", date="2025-01-01", location="Bench"))
+    rows = []
+    for i in range(archers):
+        scores = {field: random.randint(0, 5) for field in SCORE_VALUES}
+        rows.append({
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "email": f"archer{i}@example.com",
+            "club": f"Club {i % 40}",
+            "competition_id": 1,
+            "category": random.choice(list(Category)),
+            "gender": random.choice(list(Gender)),
+            "age_group": random.choice(list(AgeGroup)),
+            "total_score": compute_total_score(scores),
+            **scores,
+        })
+    session.execute(insert(Archer), rows)
+    session.commit()
+
+
+def pydantic_path(session: Session) -> bytes:
+    archers = session.scalars(select(Archer).where(Archer.competition_id == 1)).all()
+    return archer_list_adapter.dump_json(archer_list_adapter.validate_python(archers, from_attributes=True))
+
+
+def core_path(session: Session) -> bytes:
+    rows = session.execute(select(*ARCHER_OUT_COLUMNS).where(Archer.competition_id == 1)).all()
+    return dumps([row._asdict() for row in rows])
+
+
+def best_ms(session: Session, path: Callable[[Session], bytes], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        session.expunge_all()   # every request starts with an empty identity map
+        start: float = time.perf_counter()
+        path(session)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main() -> None:
+    archers: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        populate(session, archers)
+        assert len(pydantic_path(session)) > 0 and len(core_path(session)) > 0
+
+        print(f"{archers} archers, serializer: {'orjson' if orjson is not None else 'json'}")
+        print(f"ORM + Pydantic:  {best_ms(session, pydantic_path, 10):7.2f} ms")
+        print(f"Core + dumps:    {best_ms(session, core_path, 10):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
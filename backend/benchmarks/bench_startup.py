@@ -0,0 +1,110 @@
+"""
+Cold-start budget of the backend process, as seen by the desktop shell.
+
+Starts the server (main.py, or the frozen executable given with --command) on a free port and
+measures the time until /health first answers, until it reports the full app as ready, and
+until the first real API request returns. The first launch creates a new database, the second
+one starts on the stamped database like every later launch of the desktop app.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --command "dist/backend/backend.exe" --output startup.json
+
+Exits with status 1 if a launch exceeds the budget.
+"""
+import argparse
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+# budget of the desktop build in milliseconds, from starting the process
+HEALTH_BUDGET_MS: float = 500
+READY_BUDGET_MS: float = 3000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url: str) -> Optional[Any]:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+
+def launch(command: List[str], database_url: str, timeout: float) -> Dict[str, Optional[float]]:
+    port: int = free_port()
+    env: Dict[str, str] = dict(os.environ, PORT=str(port), DATABASE_URL=database_url, LOG_LEVEL="WARNING")
+    base: str = f"http://127.0.0.1:{port}"
+
+    started: float = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings: Dict[str, Optional[float]] = {"health_ms": None, "ready_ms": None, "first_request_ms": None}
+    try:
+        while time.perf_counter() - started < timeout:
+            health = get_json(f"{base}/health")
+            elapsed: float = (time.perf_counter() - started) * 1000
+            if health is not None and timings["health_ms"] is None:
+                timings["health_ms"] = round(elapsed, 1)
+            # the full app serves /health itself, it has no "ready" field
+            if health is not None and health.get("ready", True):
+                timings["ready_ms"] = round(elapsed, 1)
+                break
+            time.sleep(0.005)
+
+        if timings["ready_ms"] is not None and get_json(f"{base}/competitions") is not None:
+            timings["first_request_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--command", default=f'"{sys.executable}" main.py', help="server command line")
+    parser.add_argument("--health-budget", type=float, default=HEALTH_BUDGET_MS, help="milliseconds")
+    parser.add_argument("--ready-budget", type=float, default=READY_BUDGET_MS, help="milliseconds")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for each launch")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    database_url: str = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='archery-startup-'), 'startup.db')}"
+    command: List[str] = shlex.split(args.command, posix=os.name != "nt")
+    result: Dict[str, Any] = {"command": args.command, "launches": {}}
+    over_budget: List[str] = []
+
+    for name in ("new_database", "existing_database"):
+        timings = launch(command, database_url, args.timeout)
+        result["launches"][name] = timings
+        print(f"{name:<18} health {timings['health_ms']} ms  ready {timings['ready_ms']} ms  "
+              f"first request {timings['first_request_ms']} ms")
+
+        if timings["health_ms"] is None or timings["health_ms"] > args.health_budget:
+            over_budget.append(f"{name}: /health")
+        if timings["ready_ms"] is None or timings["ready_ms"] > args.ready_budget:
+            over_budget.append(f"{name}: ready")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+
+    if over_budget:
+        print(f"over budget ({args.health_budget:.0f} ms health, {args.ready_budget:.0f} ms ready): {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
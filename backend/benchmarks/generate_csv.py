@@ -0,0 +1,135 @@
+"""
+Synthetic registration CSVs in the layout of the Slovenian Google Forms export (archers.csv).
+
+Run from the backend directory:
+    python -m benchmarks.generate_csv rows [output.csv]
+"""
+import csv
+import datetime
+import io
+import random
+import sys
+from typing import Dict, Iterator, List, Set, TextIO, Tuple
+
+SIZES: Tuple[int, ...] = (100, 1_000, 10_000, 100_000)
+
+COLUMNS: Tuple[str, ...] = (
+    "Časovni žig", "Email", "Ime in Priimek", "Klub", "Slog", "Sporočilo organizatorju", "Stolpec 6",
+)
+
+CONSENT: str = (
+    "S prijavo na tekmo se strinjam, da se moji podatki uporabijo z namenom vodenja evidence prijav na tekmo. "
+    "Strinjam se s tem, da se podatki iz obrazca pošljejo organizatorju tekmovanja. Potrjujem tudi, da sem "
+    "seznanjen s svojimi pravicami v zvezi s posredovanjem osebnih podatkov."
+)
+
+MALE_NAMES: Tuple[str, ...] = (
+    "Jakob", "Luka", "Žan", "Nik", "Matej", "Andrej", "Boštjan", "Gašper", "Jure", "Marko",
+    "Primož", "Rok", "Tomaž", "Uroš", "Žiga", "Aljaž", "Blaž", "Matic", "Domen", "Miha",
+)
+FEMALE_NAMES: Tuple[str, ...] = (
+    "Ivana", "Nataša", "Maja", "Špela", "Ana", "Eva", "Nina", "Urška", "Tjaša", "Mojca",
+    "Petra", "Katja", "Lea", "Zala", "Neža", "Manca", "Živa", "Sara", "Brigita", "Tina",
+)
+LAST_NAMES: Tuple[str, ...] = (
+    "Novak", "Horvat", "Kovačič", "Krajnc", "Zupančič", "Potočnik", "Kovač", "Mlakar", "Kos", "Vidmar",
+    "Golob", "Turk", "Božič", "Kralj", "Zupan", "Bizjak", "Hribar", "Korošec", "Rozman", "Kotnik",
+    "Oprešnik", "Črešnovjak", "Stevanovič", "Žagar", "Petek", "Kolar", "Šinkovec", "Debeljak", "Jerič", "Čeh",
+)
+CLUBS: Tuple[str, ...] = (
+    "Šentlok", "LK MINS Postojna", "LK Budanje", "LP Dwarf Archery", "GLK Tržič", "ŠLK Perun",
+    "VLR Vilijem", "LK Taborska jama", "LK Ilirska Bistrica", "LK Čelešnk", "TKD Sovica", "3D Medvednica",
+)
+EMAIL_DOMAINS: Tuple[str, ...] = ("gmail.com", "siol.net", "t-2.net", "amis.net")
+
+BOWS: Tuple[str, ...] = ("DOLGI LOK", "GOLI LOK", "TRADICIONALNI LOK")
+
+# (Slog value, female) as they appear in the registration form
+STYLES: Tuple[Tuple[str, bool], ...] = (
+    *((f"MOŠKI {bow}", False) for bow in BOWS),
+    *((f"ŽENSKE {bow}", True) for bow in BOWS),
+    *((f"U15 FANTJE {bow}", False) for bow in BOWS),
+    *((f"U15 PUNCE {bow}", True) for bow in BOWS),
+    *((f"U10 {bow}", False) for bow in BOWS),
+    ("PRIMITIVNI LOK (ČLANI-CE)", False),
+    ("GOSTI", False),
+)
+# adults in the three bow styles dominate real entry lists
+STYLE_WEIGHTS: Tuple[int, ...] = (10, 8, 9, 3, 3, 3, 2, 2, 2, 1, 1, 1, 2, 1, 1, 2, 2)
+
+ASCII_FOLD = str.maketrans("čšžćđČŠŽĆĐ", "csczdCSZCD")
+
+
+def _unique_name(rng: random.Random, female: bool, taken: Set[str]) -> str:
+    first: str = rng.choice(FEMALE_NAMES if female else MALE_NAMES)
+    last: str = rng.choice(LAST_NAMES)
+    name = f"{first} {last}"
+    # large lists run out of plain combinations, double surnames keep every archer distinct
+    while name in taken:
+        separator: str = " " if rng.random() < 0.5 else "-"
+        last = f"{last}{separator}{rng.choice(LAST_NAMES)}"
+        name = f"{first} {last}"
+    taken.add(name)
+    return name
+
+
+def generate_rows(rows: int, seed: int = 0, resubmit_rate: float = 0.02) -> Iterator[Dict[str, str]]:
+    """
+    Yields `rows` registration rows. A small share are resubmissions of an earlier archer,
+    like the duplicates real forms collect, which the importer has to skip.
+    """
+    rng = random.Random(seed)
+    taken: Set[str] = set()
+    previous: List[Dict[str, str]] = []
+    timestamp = datetime.datetime(2025, 8, 23, 20, 0, 0)
+
+    for _ in range(rows):
+        timestamp += datetime.timedelta(seconds=rng.randint(5, 180))
+        stamp: str = f"{timestamp.day}. {timestamp.month}. {timestamp.year} {timestamp:%H:%M:%S}"
+
+        if previous and rng.random() < resubmit_rate:
+            row = dict(rng.choice(previous), **{"Časovni žig": stamp})
+            yield row
+            continue
+
+        style, female = rng.choices(STYLES, weights=STYLE_WEIGHTS)[0]
+        name: str = _unique_name(rng, female, taken)
+        email: str = f"{name.lower().translate(ASCII_FOLD).replace(' ', '.')}@{rng.choice(EMAIL_DOMAINS)}"
+        row = {
+            "Časovni žig": stamp,
+            "Email": email,
+            "Ime in Priimek": name,
+            "Klub": rng.choice(CLUBS),
+            "Slog": style,
+            "Sporočilo organizatorju": "",
+            "Stolpec 6": CONSENT,
+        }
+        if len(previous) < 1000:
+            previous.append(row)
+        yield row
+
+
+def write_csv(file: TextIO, rows: int, seed: int = 0) -> None:
+    writer = csv.DictWriter(file, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(generate_rows(rows, seed))
+
+
+def generate_csv_bytes(rows: int, seed: int = 0) -> bytes:
+    buffer = io.StringIO()
+    write_csv(buffer, rows, seed)
+    return buffer.getvalue().encode("utf-8")
+
+
+def main() -> None:
+    rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w", encoding="utf-8", newline="") as file:
+            write_csv(file, rows)
+    else:
+        sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+        write_csv(sys.stdout, rows)
+
+
+if __name__ == "__main__":
+    main()
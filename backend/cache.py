@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from constants import RESULT_CACHE_MAX_ENTRIES
+from coordination import CoordinationBackend, coordination
+
+
+class ResultCache:
+    """
+    Per-competition cache of pre-serialized JSON responses.
+
+    Every competition has a version counter that write endpoints bump after committing,
+    which makes all cached responses of that competition stale at once. Entries are
+    evicted least-recently-used first once max_entries is reached.
+
+    The versions live in the coordination backend, so with several workers a write on
+    one of them also makes the entries cached by the others stale.
+    """
+
+    def __init__(self, max_entries: int, backend: CoordinationBackend) -> None:
+        self.max_entries = max_entries
+        self.backend = backend
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, competition_id: int) -> int:
+        return self.backend.version(competition_id)
+
+    def invalidate(self, competition_id: int) -> None:
+        self.backend.bump_version(competition_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == competition_id]:
+                del self._entries[key]
+
+    def get(self, competition_id: int, key: Tuple[Hashable, ...]) -> Tuple[int, Optional[Tuple[str, bytes]]]:
+        """
+        Returns the current version of the competition and the cached (etag, body), if any.
+        """
+        version: int = self.backend.version(competition_id)
+        with self._lock:
+            full_key: Tuple[Hashable, ...] = (competition_id, version, *key)
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                self._entries.move_to_end(full_key)
+            return version, entry
+
+    def put(self, competition_id: int, version: int, key: Tuple[Hashable, ...], body: bytes) -> Tuple[str, bytes]:
+        etag: str = f'"{competition_id}-{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+        # a write may have happened while building, only store results that are still current
+        if self.backend.version(competition_id) == version:
+            with self._lock:
+                full_key: Tuple[Hashable, ...] = (competition_id, version, *key)
+                self._entries[full_key] = (etag, body)
+                self._entries.move_to_end(full_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return etag, body
+
+    async def respond(
+        self,
+        request: Request,
+        competition_id: int,
+        key: Tuple[Hashable, ...],
+        build: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        """
+        Serves a cached JSON response, building it on a miss, or 304 Not Modified if the client already has it.
+        """
+        version, entry = self.get(competition_id, key)
+        etag, body = entry if entry is not None else self.put(competition_id, version, key, await build())
+
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+result_cache = ResultCache(max_entries=RESULT_CACHE_MAX_ENTRIES, backend=coordination)
@@ -1,14 +1,77 @@
 import os
-from dotenv import load_dotenv
+import sys
 
-# load variables from .env
-load_dotenv()
+
+def _find_dotenv() -> str:
+    # same lookup as python-dotenv's find_dotenv: up to the filesystem root from this file's
+    # directory, or from the working directory in frozen builds and interactive sessions
+    # (a frozen build's __file__ is in its extraction directory, not next to the executable)
+    interactive: bool = not hasattr(sys.modules.get("__main__"), "__file__")
+    if getattr(sys, "frozen", False) or interactive:
+        directory: str = os.getcwd()
+    else:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path: str = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent: str = os.path.dirname(directory)
+        if parent == directory:
+            return ""
+        directory = parent
+
+
+# load variables from .env, python-dotenv is only imported if there is one
+_dotenv_path: str = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./default.db")
+DATABASE_ASYNC: bool = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# connection pool (file-based SQLite and server databases)
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# SQLite performance profile, applied to every new connection
+SQLITE_TUNING: bool = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
 BACKEND_PORT: int = int(os.getenv("BACKEND_PORT", 8000))
+BACKEND_HOST: str = os.getenv("BACKEND_HOST", "127.0.0.1")
+BACKEND_WORKERS: int = int(os.getenv("BACKEND_WORKERS", 1))
+
+# state shared between workers: "local" (single process), "sqlite", or "auto" to pick by worker count
+COORDINATION_BACKEND: str = os.getenv("COORDINATION_BACKEND", "auto")
+COORDINATION_PATH: str = os.getenv("COORDINATION_PATH", "coordination.db")
+LIVE_POLL_SECONDS: float = float(os.getenv("LIVE_POLL_SECONDS", 0.2))
 FE_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
 FE_BUILD_URL: str = os.getenv("FRONTEND_BUILD_URL", "http://localhost:4173")
 
+# logging and instrumentation
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", 0.1))     # share of hot-path debug records kept
+SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 0))           # 0 disables the slow-query log
+
 CSV_DATA_FILE_PATH: str = os.getenv("CSV_FILE", "data/mock_data.csv")
+CSV_CHUNK_SIZE: int = int(os.getenv("CSV_CHUNK_SIZE", 500))
+IMPORT_WORKERS: int = int(os.getenv("IMPORT_WORKERS", 2))
+IMPORT_JOBS_KEPT: int = int(os.getenv("IMPORT_JOBS_KEPT", 100))
+EXPORT_FLUSH_ROWS: int = int(os.getenv("EXPORT_FLUSH_ROWS", 500))
+RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 256))
+LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", 100))
+LIVE_KEEPALIVE_SECONDS: float = float(os.getenv("LIVE_KEEPALIVE_SECONDS", 15))
+IDEMPOTENCY_TTL_HOURS: float = float(os.getenv("IDEMPOTENCY_TTL_HOURS", 24))
+
+UPLOAD_DIR = "uploaded_logos"
+# private bookkeeping of the uploads (logo index, partial files), kept out of the served UPLOAD_DIR
+UPLOAD_STATE_DIR = "uploaded_logos_state"
 
-UPLOAD_DIR = "uploaded_logos"
\ No newline at end of file
+# resized logo variants generated on upload: name -> max width/height in pixels
+LOGO_VARIANTS = {"thumb": 128, "large": 1024}
@@ -0,0 +1,206 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from constants import BACKEND_WORKERS, COORDINATION_BACKEND, COORDINATION_PATH, IMPORT_JOBS_KEPT
+
+# live events older than this are pruned from shared backends, subscribers poll far more often
+LIVE_EVENT_RETENTION_SECONDS: float = 60.0
+
+
+class CoordinationBackend:
+    """
+    State that has to agree between the worker processes of one server: cache versions of
+    competitions, live events and subscribers, and import job progress.
+
+    The base class is the single-process implementation, everything stays in memory and
+    live events are delivered to subscribers directly by the hub.
+    """
+
+    # whether other processes see this state, live events then travel through the backend
+    shared: bool = False
+
+    def __init__(self) -> None:
+        self._versions: Dict[int, int] = {}
+        self._subscribers: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, competition_id: int) -> int:
+        with self._lock:
+            return self._versions.get(competition_id, 0)
+
+    def bump_version(self, competition_id: int) -> int:
+        with self._lock:
+            version: int = self._versions.get(competition_id, 0) + 1
+            self._versions[competition_id] = version
+            return version
+
+    def add_subscribers(self, competition_id: int, delta: int) -> None:
+        with self._lock:
+            count: int = self._subscribers.get(competition_id, 0) + delta
+            if count > 0:
+                self._subscribers[competition_id] = count
+            else:
+                self._subscribers.pop(competition_id, None)
+
+    def subscriber_count(self, competition_id: int) -> int:
+        with self._lock:
+            return self._subscribers.get(competition_id, 0)
+
+    def clear_subscribers(self) -> None:
+        # called before workers start, counts of an earlier (crashed) server are stale
+        with self._lock:
+            self._subscribers.clear()
+
+    def publish_event(self, competition_id: int, frame: str) -> None:
+        # in-process live events are delivered by the hub, nothing to store
+        pass
+
+    def last_event_id(self) -> int:
+        return 0
+
+    def events_after(self, event_id: int) -> List[Tuple[int, int, str]]:
+        return []
+
+    def save_job(self, job_id: str, data: Dict[str, Any]) -> None:
+        pass
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return None
+
+
+class SQLiteBackend(CoordinationBackend):
+    """
+    Shares state through a small SQLite file next to the application, which works for any
+    number of workers on one machine regardless of the main database.
+
+    Every process and thread keeps its own connection; WAL mode lets readers proceed while
+    another worker writes.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, jobs_kept: int) -> None:
+        super().__init__()
+        self.path = path
+        self.jobs_kept = jobs_kept
+        self._local = threading.local()
+
+        connection: sqlite3.Connection = self._connection()
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                competition_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS live_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                competition_id INTEGER NOT NULL,
+                frame TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS live_subscribers (
+                competition_id INTEGER PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            # autocommit, every statement is its own short transaction
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def version(self, competition_id: int) -> int:
+        row = self._connection().execute(
+            "SELECT version FROM cache_versions WHERE competition_id = ?", (competition_id,)
+        ).fetchone()
+        return row[0] if row is not None else 0
+
+    def bump_version(self, competition_id: int) -> int:
+        return self._connection().execute(
+            "INSERT INTO cache_versions (competition_id, version) VALUES (?, 1) "
+            "ON CONFLICT (competition_id) DO UPDATE SET version = version + 1 RETURNING version",
+            (competition_id,),
+        ).fetchone()[0]
+
+    def add_subscribers(self, competition_id: int, delta: int) -> None:
+        connection: sqlite3.Connection = self._connection()
+        connection.execute(
+            "INSERT INTO live_subscribers (competition_id, count) VALUES (?, ?) "
+            "ON CONFLICT (competition_id) DO UPDATE SET count = count + excluded.count",
+            (competition_id, delta),
+        )
+        connection.execute("DELETE FROM live_subscribers WHERE count <= 0")
+
+    def subscriber_count(self, competition_id: int) -> int:
+        row = self._connection().execute(
+            "SELECT count FROM live_subscribers WHERE competition_id = ?", (competition_id,)
+        ).fetchone()
+        return row[0] if row is not None else 0
+
+    def clear_subscribers(self) -> None:
+        self._connection().execute("DELETE FROM live_subscribers")
+
+    def publish_event(self, competition_id: int, frame: str) -> None:
+        connection: sqlite3.Connection = self._connection()
+        now: float = time.time()
+        event_id: int = connection.execute(
+            "INSERT INTO live_events (competition_id, frame, created_at) VALUES (?, ?, ?)",
+            (competition_id, frame, now),
+        ).lastrowid  # type: ignore
+        if event_id % 100 == 0:
+            connection.execute("DELETE FROM live_events WHERE created_at < ?", (now - LIVE_EVENT_RETENTION_SECONDS,))
+
+    def last_event_id(self) -> int:
+        return self._connection().execute("SELECT coalesce(max(id), 0) FROM live_events").fetchone()[0]
+
+    def events_after(self, event_id: int) -> List[Tuple[int, int, str]]:
+        return self._connection().execute(
+            "SELECT id, competition_id, frame FROM live_events WHERE id > ? ORDER BY id", (event_id,)
+        ).fetchall()
+
+    def save_job(self, job_id: str, data: Dict[str, Any]) -> None:
+        connection: sqlite3.Connection = self._connection()
+        values: Tuple[str, float, str] = (json.dumps(data), time.time(), job_id)
+        updated: int = connection.execute("UPDATE import_jobs SET data = ?, updated_at = ? WHERE id = ?", values).rowcount
+        if not updated:
+            connection.execute("INSERT INTO import_jobs (data, updated_at, id) VALUES (?, ?, ?)", values)
+            # only the most recent jobs are kept, like the in-process registry
+            connection.execute(
+                "DELETE FROM import_jobs WHERE id NOT IN (SELECT id FROM import_jobs ORDER BY updated_at DESC LIMIT ?)",
+                (self.jobs_kept,),
+            )
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT data FROM import_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+
+# available backends by name, deployments can register their own (e.g. Redis) here
+BACKENDS: Dict[str, Callable[[], CoordinationBackend]] = {
+    "local": CoordinationBackend,
+    "sqlite": lambda: SQLiteBackend(COORDINATION_PATH, IMPORT_JOBS_KEPT),
+}
+
+
+def create_backend(name: str) -> CoordinationBackend:
+    if name == "auto":
+        # a single worker has nothing to coordinate with
+        name = "sqlite" if BACKEND_WORKERS > 1 else "local"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown coordination backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+coordination: CoordinationBackend = create_backend(COORDINATION_BACKEND)
@@ -1,14 +1,219 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Iterator, List, Sequence, TypeVar
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, delete, event, insert, inspect, select, text, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from constants import DATABASE_URL
+from sqlalchemy.sql import Executable
+from constants import (
+    DATABASE_ASYNC, DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_JOURNAL_MODE, SQLITE_MMAP_SIZE, SQLITE_SYNCHRONOUS, SQLITE_TUNING,
+)
+from models import Archer, Base, Competition, IdempotencyKey, SchemaInfo
+from metrics import instrument_engine
+from logs import get_logger
+
+logger = get_logger("database")
+
+# keeps IN (...) lists below SQLite's bound parameter limit
+IN_BATCH_SIZE: int = 500
+
+T = TypeVar("T")
+
+
+def batches(values: Sequence[T], size: int = IN_BATCH_SIZE) -> Iterator[Sequence[T]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_sqlite_memory(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Pool settings for the given database URL.
+
+    SQLite in WAL mode serves many concurrent readers next to a single writer, so file
+    databases get a pool large enough for every polling client to hold a connection.
+    Server databases additionally recycle and pre-ping connections that may have been
+    dropped by the server.
+    """
+    if is_sqlite_memory(url):
+        # in-memory databases live and die with their single connection, keep SQLAlchemy's default pool
+        return {}
+
+    options: Dict[str, Any] = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if not is_sqlite(url):
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = DB_POOL_RECYCLE
+
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")   # negative value is in KiB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 
 engine = create_engine(
     DATABASE_URL, 
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False} if is_sqlite(DATABASE_URL) else {},
+    **engine_options(DATABASE_URL)
 )
 
+if is_sqlite(DATABASE_URL) and SQLITE_TUNING:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(
     autocommit=False, 
     autoflush=False, 
     bind=engine
-)
\ No newline at end of file
+)
+
+
+def to_async_url(url: str) -> str:
+    # pick the asyncio driver for the configured database
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:") or url.startswith("postgres:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+# optional asyncio engine, the frozen desktop build keeps using the sync engine only
+async_engine = None
+AsyncSessionLocal = None
+
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+
+    if is_sqlite(DATABASE_URL) and SQLITE_TUNING:
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _fetch_all_sync(statement: Executable, scalars: bool) -> List[Any]:
+    with SessionLocal() as session:
+        result = session.execute(statement)
+        return list(result.scalars().all() if scalars else result.all())
+
+
+async def fetch_all(statement: Executable, scalars: bool = False) -> List[Any]:
+    """
+    Runs a read-only statement without blocking the event loop.
+
+    Uses the asyncio engine if DATABASE_ASYNC is enabled, otherwise the sync
+    session is run in the threadpool only for the duration of the query.
+    Returns ORM objects if scalars is set, otherwise rows.
+    """
+    if AsyncSessionLocal is None:
+        return await run_in_threadpool(_fetch_all_sync, statement, scalars)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(statement)
+        return list(result.scalars().all() if scalars else result.all())
+
+
+async def fetch_scalars(statement: Executable) -> List[Any]:
+    return await fetch_all(statement, scalars=True)
+
+
+# bump whenever the models or migrate_schema change, databases stamped with an older version are prepared again
+SCHEMA_VERSION: int = 4
+
+
+def read_schema_version(bind: Engine) -> int:
+    try:
+        with bind.connect() as connection:
+            return connection.execute(select(SchemaInfo.version).where(SchemaInfo.id == 1)).scalar() or 0
+    except DBAPIError:
+        # databases of older versions have no schema_info table yet
+        return 0
+
+
+def prepare_database(bind: Engine) -> None:
+    """
+    Creates missing tables and applies migrations, unless the database is already stamped
+    with the current SCHEMA_VERSION. A stamped database costs a single query at startup
+    instead of reflecting every table.
+    """
+    if read_schema_version(bind) == SCHEMA_VERSION:
+        return
+
+    logger.info("Preparing database schema version %d", SCHEMA_VERSION)
+    Base.metadata.create_all(bind=bind)
+    complete: bool = migrate_schema(bind)
+    # search imports the batching helpers above
+    from search import create_search_index
+    create_search_index(bind)
+    if not complete:
+        return
+
+    with bind.begin() as connection:
+        connection.execute(delete(SchemaInfo))
+        connection.execute(insert(SchemaInfo).values(id=1, version=SCHEMA_VERSION))
+
+
+def migrate_schema(bind: Engine) -> bool:
+    """
+    Brings databases created by older versions up to date with the current models.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables are applied (and backfilled) here. Returns False if a migration
+    could not be applied yet and has to be retried on the next start.
+    """
+    inspector = inspect(bind)
+    archer_columns = {column["name"] for column in inspector.get_columns(Archer.__tablename__)}
+    competition_columns = {column["name"] for column in inspector.get_columns(Competition.__tablename__)}
+    idempotency_columns = {column["name"] for column in inspector.get_columns(IdempotencyKey.__tablename__)}
+
+    with bind.begin() as connection:
+        if "total_score" not in archer_columns:
+            logger.info("Adding total_score column to archers")
+            connection.execute(text("ALTER TABLE archers ADD COLUMN total_score INTEGER NOT NULL DEFAULT 0"))
+            connection.execute(update(Archer).values(total_score=Archer.total_score_expression()))
+
+        if "version" not in archer_columns:
+            logger.info("Adding version column to archers")
+            connection.execute(text("ALTER TABLE archers ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+        if "request_hash" not in idempotency_columns:
+            # stored responses cannot be matched to their payload, retries of them run again
+            logger.info("Adding request_hash column to idempotency_keys")
+            connection.execute(delete(IdempotencyKey))
+            connection.execute(text("ALTER TABLE idempotency_keys ADD COLUMN request_hash VARCHAR NOT NULL DEFAULT ''"))
+
+        if "season_id" not in competition_columns:
+            logger.info("Adding season_id column to competitions")
+            connection.execute(text("ALTER TABLE competitions ADD COLUMN season_id INTEGER REFERENCES seasons(id)"))
+
+    complete: bool = True
+    for index in Archer.__table__.indexes:
+        try:
+            with bind.begin() as connection:
+                index.create(bind=connection, checkfirst=True)
+        except IntegrityError:
+            # older versions did not prevent duplicate archers, the unique index has to wait until they are removed
+            logger.warning("Could not create unique index %s, remove duplicate archers first", index.name)
+            complete = False
+
+    return complete
@@ -0,0 +1,162 @@
+import csv
+import io
+import tempfile
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import desc, func, select
+
+from constants import EXPORT_FLUSH_ROWS
+from database import SessionLocal
+from models import Archer, SCORE_VALUES
+
+# size of the chunks a finished XLSX/PDF file is streamed in
+FILE_CHUNK_SIZE: int = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+EXPORT_HEADER: List[str] = [
+    "category", "gender", "age_group", "place", "first_name", "last_name", "club",
+    *SCORE_VALUES, "total_score",
+]
+
+Division = Tuple[str, str, str]
+
+
+def iter_ranked_rows(competition_id: int) -> Iterator[Tuple[Division, List[Any]]]:
+    """
+    Yields (division, export row) for every archer of the competition, grouped by division
+    and ranked within it. Rows are read from a single ordered query in batches, places are
+    assigned as the rows go by, with ties (same total, 20s and 18s) sharing a place.
+    """
+    tie_break = (Archer.total_score, func.coalesce(Archer.score20, 0), func.coalesce(Archer.score18, 0))
+    query = (
+        select(
+            Archer.category, Archer.gender, Archer.age_group,
+            Archer.first_name, Archer.last_name, Archer.club,
+            *(getattr(Archer, field) for field in SCORE_VALUES), *tie_break,
+        )
+        .where(Archer.competition_id == competition_id)
+        .order_by(
+            Archer.category, Archer.gender, Archer.age_group,
+            *(desc(column) for column in tie_break), Archer.last_name, Archer.first_name,
+        )
+        .execution_options(yield_per=EXPORT_FLUSH_ROWS)
+    )
+
+    with SessionLocal() as db:
+        division: Optional[Division] = None
+        previous_key: Optional[Tuple[Any, ...]] = None
+        position: int = 0
+        place: int = 0
+
+        for row in db.execute(query):
+            row_division: Division = (row.category.value, row.gender.value, row.age_group.value)
+            if row_division != division:
+                division, previous_key, position = row_division, None, 0
+
+            position += 1
+            key: Tuple[Any, ...] = tuple(row[-len(tie_break):])
+            if key != previous_key:
+                place, previous_key = position, key
+
+            yield division, [
+                *division, place, row.first_name, row.last_name, row.club,
+                *(getattr(row, field) for field in SCORE_VALUES), row.total_score,
+            ]
+
+
+def stream_csv(competition_id: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+
+    for i, (_, row) in enumerate(iter_ranked_rows(competition_id), start=1):
+        writer.writerow(row)
+        if i % EXPORT_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def _stream_file(file: Any) -> Iterator[bytes]:
+    try:
+        file.seek(0)
+        while chunk := file.read(FILE_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+def stream_xlsx(competition_id: int) -> Iterator[bytes]:
+    # openpyxl is optional, only needed for XLSX exports
+    from openpyxl import Workbook
+
+    # write-only workbooks keep just the current row in memory, the file itself is spooled
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(EXPORT_HEADER)
+    for _, row in iter_ranked_rows(competition_id):
+        sheet.append(row)
+
+    file = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    workbook.save(file)
+    return _stream_file(file)
+
+
+def stream_pdf(competition_id: int, title: str) -> Iterator[bytes]:
+    # reportlab is optional, only needed for PDF exports
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen.canvas import Canvas
+
+    # Vera ships with reportlab and covers č, š, ž, ć, đ (the built-in Helvetica does not)
+    if "Vera" not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont("Vera", "Vera.ttf"))
+        pdfmetrics.registerFont(TTFont("VeraBd", "VeraBd.ttf"))
+
+    width, height = landscape(A4)
+    margin, line_height = 36, 14
+    columns: List[Tuple[str, float]] = [
+        ("place", 40), ("first_name", 110), ("last_name", 130), ("club", 170),
+        *((field, 32) for field in SCORE_VALUES), ("total_score", 50),
+    ]
+
+    file = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    canvas = Canvas(file, pagesize=(width, height), pageCompression=1)
+    canvas.setTitle(title)
+    y: float = 0
+
+    def line(values: List[Any], font: str = "Vera") -> None:
+        nonlocal y
+        if y < margin:
+            canvas.showPage()
+            y = height - margin
+        canvas.setFont(font, 9)
+        x: float = margin
+        for (_, column_width), value in zip(columns, values):
+            canvas.drawString(x, y, "" if value is None else str(value))
+            x += column_width
+        y -= line_height
+
+    canvas.setFont("VeraBd", 14)
+    canvas.drawString(margin, height - margin, title)
+    y = height - margin - 2 * line_height
+
+    division: Optional[Division] = None
+    for row_division, row in iter_ranked_rows(competition_id):
+        if row_division != division:
+            division = row_division
+            y -= line_height / 2
+            line([" / ".join(division)], font="VeraBd")
+            line([name.replace("score", "") for name, _ in columns], font="VeraBd")
+        line(row[3:])
+
+    canvas.save()
+    return _stream_file(file)
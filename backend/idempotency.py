@@ -0,0 +1,75 @@
+import hashlib
+import random
+import time
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from constants import IDEMPOTENCY_TTL_HOURS
+from models import IdempotencyKey
+from serialization import dumps
+
+# share of remembered responses that also prune expired keys
+PRUNE_PROBABILITY: float = 0.01
+
+
+def request_hash(payload: Any) -> str:
+    # payload is the request body as plain JSON values, e.g. a model_dump(mode="json")
+    return hashlib.sha256(dumps(payload)).hexdigest()
+
+
+def replay(db: Session, key: Optional[str], scope: str, payload_hash: str) -> Optional[Response]:
+    """
+    Returns the stored response of an earlier request with the same Idempotency-Key, if any.
+    A key reused for another endpoint or with another payload is rejected with 422.
+    """
+    if key is None:
+        return None
+
+    stored: Optional[IdempotencyKey] = db.get(IdempotencyKey, key)
+    if stored is None or stored.created_at < time.time() - IDEMPOTENCY_TTL_HOURS * 3600:  # type: ignore
+        return None
+    if stored.scope != scope or stored.request_hash != payload_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+    return Response(
+        content=stored.body,  # type: ignore
+        status_code=stored.status_code,  # type: ignore
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def remember(db: Session, key: Optional[str], scope: str, payload_hash: str, body: bytes, status_code: int = 200) -> None:
+    """
+    Stores the response in the write's own transaction, so it is kept exactly when the write commits.
+    """
+    if key is None:
+        return
+
+    now: float = time.time()
+    if random.random() < PRUNE_PROBABILITY:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < now - IDEMPOTENCY_TTL_HOURS * 3600))
+    # an expired key may still be stored until the next prune
+    db.merge(IdempotencyKey(
+        key=key, scope=scope, request_hash=payload_hash, status_code=status_code, body=body, created_at=now
+    ))
+
+
+def commit(db: Session, key: Optional[str], scope: str, payload_hash: str) -> Optional[Response]:
+    """
+    Commits the write. If a concurrent retry with the same key committed first, the write is
+    rolled back and that request's response is returned instead; other integrity errors are raised.
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        replayed: Optional[Response] = replay(db, key, scope, payload_hash)
+        if replayed is None:
+            raise
+        return replayed
+    return None
@@ -0,0 +1,215 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Insert, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from cache import result_cache
+from constants import CSV_CHUNK_SIZE, IMPORT_JOBS_KEPT, IMPORT_WORKERS
+from coordination import CoordinationBackend, coordination
+from database import SessionLocal
+from live import live_hub
+from logs import get_logger
+from models import Archer, Language
+from parse import iter_csv_chunks, parse_archer_row
+from search import SEARCH_COLUMNS, index_archers
+
+logger = get_logger("imports")
+
+# only the first few row errors are kept per import
+MAX_REPORTED_ERRORS: int = 100
+
+# columns of ux_archers_competition_name, the identity of an archer within a competition
+ARCHER_IDENTITY: List[str] = ["competition_id", "last_name", "first_name"]
+
+
+def insert_new_archers(dialect: str) -> Insert:
+    # archers created by other writers since the names were loaded are skipped instead of failing the import
+    if dialect == "sqlite":
+        return sqlite.insert(Archer).on_conflict_do_nothing(index_elements=ARCHER_IDENTITY)
+    if dialect == "postgresql":
+        return postgresql.insert(Archer).on_conflict_do_nothing(index_elements=ARCHER_IDENTITY)
+    return insert(Archer)
+
+
+class ImportJob:
+    """
+    Progress of a single CSV import, updated chunk by chunk while the import runs.
+    """
+
+    def __init__(self, competition_id: int) -> None:
+        self.id: str = uuid.uuid4().hex
+        self.competition_id = competition_id
+        self.status: str = "queued"
+        self.rows_processed: int = 0
+        self.inserted: int = 0
+        self.skipped: int = 0
+        self.failed: int = 0
+        self.errors: List[str] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed: float = (self.finished_at or time.time()) - self.started_at
+        return self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+    def add_error(self, message: str) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImportJob":
+        job = cls.__new__(cls)
+        job.__dict__.update(data)
+        return job
+
+
+def import_archers_csv(
+    db: Session,
+    binary: BinaryIO,
+    language: Language,
+    job: ImportJob,
+    commit_per_chunk: bool = False,
+    on_progress: Optional[Callable[[ImportJob], None]] = None,
+) -> ImportJob:
+    """
+    Streams a registration CSV file into the archers table of job.competition_id.
+
+    Duplicates (already in the competition or repeated within the file) are skipped.
+    With commit_per_chunk every chunk is its own transaction, so score entry is not
+    locked out while a large file imports; otherwise the whole file is one transaction.
+    on_progress is called with the job after every chunk and once the import is done.
+    """
+    competition_id: int = job.competition_id
+    job.status = "running"
+    job.started_at = time.time()
+
+    # load names of archers already in this competition with a single query
+    existing: Set[Tuple[str, str]] = set(
+        db.query(Archer.first_name, Archer.last_name)
+        .filter(Archer.competition_id == competition_id)
+        .all()
+    )
+
+    # stream the CSV file and insert it chunk by chunk
+    for rows in iter_csv_chunks(binary, CSV_CHUNK_SIZE):
+        new_archers: List[Dict[str, Any]] = []
+
+        for row in rows:
+            job.rows_processed += 1
+            archer: Optional[Dict[str, Any]] = parse_archer_row(row, competition_id, language)
+            if archer is None:
+                job.failed += 1
+                job.add_error(f"row {job.rows_processed}: missing archer name")
+                continue
+
+            # avoid duplicates (in DB and within the uploaded file itself)
+            key: Tuple[str, str] = (archer["first_name"], archer["last_name"])
+            if key in existing:
+                job.skipped += 1
+                continue
+
+            existing.add(key)
+            new_archers.append(archer)
+
+        # insert all new archers of this chunk with a single executemany
+        if new_archers:
+            inserted: List[Any] = db.execute(
+                insert_new_archers(db.get_bind().dialect.name).returning(*SEARCH_COLUMNS), new_archers
+            ).all()
+            index_archers(db, inserted, replace=False)
+            if commit_per_chunk:
+                db.commit()
+                # committed rows are visible right away, cached lists must not outlive them
+                result_cache.invalidate(competition_id)
+            job.inserted += len(inserted)
+            job.skipped += len(new_archers) - len(inserted)
+
+        if on_progress is not None:
+            on_progress(job)
+
+    db.commit()
+    job.status = "done"
+    job.finished_at = time.time()
+    if on_progress is not None:
+        on_progress(job)
+
+    result_cache.invalidate(competition_id)
+    live_hub.publish(competition_id, "imported", {"inserted": job.inserted})
+    logger.info("Archers loaded from CSV into DB (inserted: %d, skipped: %d, failed: %d)", job.inserted, job.skipped, job.failed)
+
+    return job
+
+
+class ImportJobRegistry:
+    """
+    Runs imports in a background thread pool and keeps the most recent jobs for progress polling.
+
+    Progress is also stored in the coordination backend, so the job can be polled through
+    any worker, not only the one running it.
+    """
+
+    def __init__(self, workers: int, jobs_kept: int, backend: CoordinationBackend) -> None:
+        self.jobs_kept = jobs_kept
+        self.backend = backend
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import")
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            job: Optional[ImportJob] = self._jobs.get(job_id)
+        if job is None:
+            data: Optional[Dict[str, Any]] = self.backend.load_job(job_id)
+            job = ImportJob.from_dict(data) if data is not None else None
+        return job
+
+    def _share(self, job: ImportJob) -> None:
+        self.backend.save_job(job.id, job.to_dict())
+
+    def submit(self, binary: BinaryIO, competition_id: int, language: Language) -> ImportJob:
+        # copy the upload in chunks, the request's file is gone once the response is sent
+        with tempfile.NamedTemporaryFile(prefix="import_", suffix=".csv", delete=False) as stored:
+            shutil.copyfileobj(binary, stored)
+
+        job = ImportJob(competition_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.jobs_kept:
+                self._jobs.popitem(last=False)
+        self._share(job)
+
+        self._executor.submit(self._run, stored.name, language, job)
+        return job
+
+    def _run(self, path: str, language: Language, job: ImportJob) -> None:
+        db: Session = SessionLocal()
+        try:
+            with open(path, "rb") as binary:
+                import_archers_csv(db, binary, language, job, commit_per_chunk=True, on_progress=self._share)
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.finished_at = time.time()
+            job.add_error(str(exc) if not isinstance(exc, UnicodeDecodeError) else "Could not decode CSV file")
+            self._share(job)
+        finally:
+            db.close()
+            os.remove(path)
+
+
+import_jobs = ImportJobRegistry(workers=IMPORT_WORKERS, jobs_kept=IMPORT_JOBS_KEPT, backend=coordination)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from constants import LIVE_POLL_SECONDS, LIVE_QUEUE_SIZE
+from coordination import CoordinationBackend, coordination
+
+
+class LiveHub:
+    """
+    In-process broadcast hub for live competition updates.
+
+    Each event is encoded once as a server-sent event frame and handed to every
+    subscriber queue of the competition. Publishing is safe from the sync endpoints
+    running in the threadpool; slow subscribers whose queue is full miss events
+    instead of blocking the writer.
+
+    With a shared coordination backend events are written to the backend instead, and
+    every worker with subscribers polls it, so a score entered on one worker reaches the
+    displays connected to any other. Subscribers are counted in the backend, so writers
+    of every worker skip building events nobody receives.
+    """
+
+    def __init__(self, queue_size: int, backend: CoordinationBackend) -> None:
+        self.queue_size = queue_size
+        self.backend = backend
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, competition_id: int) -> bool:
+        # with a shared backend this includes the subscribers connected to other workers
+        return self.backend.subscriber_count(competition_id) > 0
+
+    @asynccontextmanager
+    async def subscribe(self, competition_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.backend.shared and self._poller is None:
+            # only events published from now on are delivered
+            last_event_id: int = await run_in_threadpool(self.backend.last_event_id)
+            if self._poller is None:
+                self._poller = asyncio.create_task(self._poll(last_event_id))
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(competition_id, set()).add(queue)
+        await run_in_threadpool(self.backend.add_subscribers, competition_id, 1)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                queues = self._subscribers.get(competition_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[competition_id]
+            await run_in_threadpool(self.backend.add_subscribers, competition_id, -1)
+
+    def publish(self, competition_id: int, event: str, data: Dict[str, Any]) -> None:
+        if self.backend.shared:
+            self.backend.publish_event(competition_id, f"event: {event}\ndata: {json.dumps(data)}\n\n")
+            return
+
+        with self._lock:
+            queues = list(self._subscribers.get(competition_id, ()))
+            loop = self._loop
+        if not queues or loop is None:
+            return
+
+        frame: str = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        for queue in queues:
+            loop.call_soon_threadsafe(self._offer, queue, frame)
+
+    async def _poll(self, last_event_id: int) -> None:
+        # runs while this worker has subscribers, restarted by the next subscription
+        try:
+            while self._subscribers:
+                for event_id, competition_id, frame in await run_in_threadpool(self.backend.events_after, last_event_id):
+                    last_event_id = event_id
+                    for queue in list(self._subscribers.get(competition_id, ())):
+                        self._offer(queue, frame)
+                await asyncio.sleep(LIVE_POLL_SECONDS)
+        finally:
+            self._poller = None
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, frame: str) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            pass
+
+
+live_hub = LiveHub(queue_size=LIVE_QUEUE_SIZE, backend=coordination)
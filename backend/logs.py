@@ -0,0 +1,31 @@
+import logging
+import random
+
+from constants import LOG_LEVEL, LOG_SAMPLE_RATE
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a random share of records below WARNING, warnings and errors always pass."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def setup_logging() -> None:
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"archery.{name}")
+
+
+def get_sampled_logger(name: str) -> logging.Logger:
+    """Logger for per-request hot paths, where logging every call would cost more than the request."""
+    logger = get_logger(name)
+    if not any(isinstance(f, SampleFilter) for f in logger.filters):
+        logger.addFilter(SampleFilter(LOG_SAMPLE_RATE))
+    return logger
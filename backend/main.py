@@ -0,0 +1,106 @@
+"""
+Startup-optimized entry point used by the desktop shell.
+
+The ASGI app below answers /health without importing FastAPI or SQLAlchemy, so the
+shell sees the backend as soon as the socket is bound. The full application (app.py)
+is imported and its database prepared in a background thread right after the server
+starts; other requests wait for it and are then passed through.
+
+    uvicorn main:app        or        python main.py
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from constants import BACKEND_HOST, BACKEND_WORKERS
+
+BOOT_STARTED: float = time.perf_counter()
+
+
+class BootApp:
+    def __init__(self) -> None:
+        self._app: Any = None
+        self._error: Optional[BaseException] = None
+        self._ready = threading.Event()
+        self._loader: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.ready_after: Optional[float] = None     # seconds from process start until the app was loaded
+
+    def start_loading(self) -> None:
+        with self._lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load, name="app-loader", daemon=True)
+                self._loader.start()
+
+    def _load(self) -> None:
+        try:
+            from app import app, startup_event
+            startup_event()
+            self._app = app
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self.ready_after = time.perf_counter() - BOOT_STARTED
+            self._ready.set()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and scope["path"] == "/health":
+            await self._health(send)
+            return
+
+        if not self._ready.is_set():
+            self.start_loading()
+            await asyncio.get_running_loop().run_in_executor(None, self._ready.wait)
+        if self._error is not None:
+            raise RuntimeError("Backend failed to start") from self._error
+
+        await self._app(scope, receive, send)
+
+    async def _lifespan(self, receive: Any, send: Any) -> None:
+        # the full app's startup work (schema preparation) runs in the loader instead of the lifespan
+        while True:
+            message: Dict[str, Any] = await receive()
+            if message["type"] == "lifespan.startup":
+                self.start_loading()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _health(self, send: Any) -> None:
+        body: bytes = json.dumps({
+            "status": "ok" if self._error is None else "error",
+            "ready": self._app is not None,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200 if self._error is None else 500,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+app = BootApp()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get("PORT", 8000))
+    if BACKEND_WORKERS > 1:
+        # prepare the schema once here instead of racing in every worker's loader
+        from coordination import coordination
+        from database import engine, prepare_database
+        prepare_database(engine)
+        coordination.clear_subscribers()
+        uvicorn.run("main:app", host=BACKEND_HOST, port=port, workers=BACKEND_WORKERS, log_level="info")
+    else:
+        # run uvicorn programmatically (good for freezing)
+        uvicorn.run(app, host=BACKEND_HOST, port=port, log_level="info")
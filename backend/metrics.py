@@ -0,0 +1,177 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from constants import SLOW_QUERY_MS
+from logs import get_logger
+
+logger = get_logger("sql")
+
+# upper bounds of the latency histogram in seconds, +Inf is implied
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Queries executed and time spent in the database while serving one request."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# set by the middleware, the thread pool running sync endpoints inherits it with the request's context
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+class Metrics:
+    """
+    In-process registry rendered in the Prometheus text format.
+
+    Routes are labelled with their path template rather than the concrete URL so that the
+    number of series stays bounded no matter how many competitions or archers exist.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._db_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        self._queries: Dict[Tuple[str, str], int] = {}
+        self._slow_queries = 0
+        self.queries_total = 0
+        self.db_seconds_total = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            self._latency.setdefault(key, Histogram()).observe(seconds)
+            self._db_latency.setdefault(key, Histogram()).observe(stats.db_seconds)
+            self._requests[(method, route, status)] = self._requests.get((method, route, status), 0) + 1
+            self._queries[key] = self._queries.get(key, 0) + stats.queries
+
+    def observe_query(self, seconds: float, slow: bool) -> None:
+        with self._lock:
+            self.queries_total += 1
+            self.db_seconds_total += seconds
+            if slow:
+                self._slow_queries += 1
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            self._render_histograms(lines, "http_request_duration_seconds", self._latency)
+            self._render_histograms(lines, "http_request_db_seconds", self._db_latency)
+
+            lines.append("# TYPE http_request_queries_total counter")
+            for (method, route), count in sorted(self._queries.items()):
+                lines.append(f'http_request_queries_total{{method="{method}",route="{route}"}} {count}')
+
+            # totals include queries outside of requests, e.g. background imports
+            lines.append("# TYPE db_queries_total counter")
+            lines.append(f"db_queries_total {self.queries_total}")
+            lines.append("# TYPE db_query_seconds_total counter")
+            lines.append(f"db_query_seconds_total {self.db_seconds_total:.6f}")
+            lines.append("# TYPE db_slow_queries_total counter")
+            lines.append(f"db_slow_queries_total {self._slow_queries}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, histograms: Dict[Tuple[str, str], Histogram]) -> None:
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), histogram.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware so streamed responses (exports, live updates) pass through untouched."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            # the router stores the matched route in the shared scope
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], getattr(route, "path", "<unmatched>"), status, time.perf_counter() - start, stats,
+            )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count every statement and its duration, attributing it to the current request if there is one."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # type: ignore
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+
+        slow = SLOW_QUERY_MS > 0 and seconds * 1000 >= SLOW_QUERY_MS
+        if slow:
+            logger.warning("slow query (%.1f ms): %s", seconds * 1000, " ".join(statement.split()))
+        metrics.observe_query(seconds, slow)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context) -> None:  # type: ignore
+        # failed statements never reach after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
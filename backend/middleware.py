@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from constants import FE_URL, FE_BUILD_URL
+from metrics import MetricsMiddleware
 
 def setup_cors(app: FastAPI):
     app.add_middleware(
@@ -9,4 +10,9 @@ def setup_cors(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-    )
\ No newline at end of file
+    )
+
+
+def setup_metrics(app: FastAPI):
+    # request latency and per-request query counts, exposed on /metrics
+    app.add_middleware(MetricsMiddleware)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Float, Integer, LargeBinary, String, ForeignKey, Index, func, Enum as SQLEnum
 from sqlalchemy.orm import declarative_base, relationship
 from enum import Enum
+from typing import Dict, Mapping, Optional
 
 Base = declarative_base()
 
@@ -29,8 +30,36 @@ class AgeGroup(Enum):
     ADULTS = 'adults'
 
 
+# point value of each hit-count column on Archer
+SCORE_VALUES: Dict[str, int] = {
+    "score20": 20,
+    "score18": 18,
+    "score16": 16,
+    "score14": 14,
+    "score12": 12,
+    "score10": 10,
+    "score8": 8,
+    "score6": 6,
+    "score4": 4,
+    "score0": 0,
+}
+
+
+def compute_total_score(scores: Mapping[str, Optional[int]]) -> int:
+    return sum((scores.get(field) or 0) * value for field, value in SCORE_VALUES.items())
+
+
 class Archer(Base):
     __tablename__ = "archers"
+    __table_args__ = (
+        # leaderboard reads filter by division and sort by total, then by number of 20s and 18s
+        Index(
+            "ix_archers_division_total_score",
+            "competition_id", "category", "gender", "age_group", "total_score", "score20", "score18",
+        ),
+        # archers are identified by name within a competition (score entry, CSV import dedupe)
+        Index("ux_archers_competition_name", "competition_id", "last_name", "first_name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
@@ -49,6 +78,12 @@ class Archer(Base):
     score4  = Column(Integer, nullable=True)
     score0  = Column(Integer, nullable=True)
 
+    # precomputed from the score columns above, kept in sync on every score write
+    total_score = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # incremented by every write, clients send it back to detect concurrent changes
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     category = Column(SQLEnum(Category), nullable=False)
     gender = Column(SQLEnum(Gender), nullable=False)
     age_group = Column(SQLEnum(AgeGroup), nullable=False)
@@ -57,6 +92,18 @@ class Archer(Base):
     competition_id = Column(Integer, ForeignKey("competitions.id"))     # foreign key to Competition
     competition = relationship("Competition", back_populates="archers") # declare relationship to Competition
 
+    # one-to-many relationship to ScoreEntry
+    score_entries = relationship("ScoreEntry", back_populates="archer", cascade="all, delete-orphan")
+
+    @staticmethod
+    def total_score_expression(scores: Optional[Dict[str, Optional[int]]] = None):
+        # SQL equivalent of compute_total_score, the given scores replace the stored ones
+        scores = scores or {}
+        return sum(
+            ((scores[field] or 0) if field in scores else func.coalesce(getattr(Archer, field), 0)) * value
+            for field, value in SCORE_VALUES.items()
+        )
+
 class Competition(Base):
     __tablename__ = "competitions"
 
@@ -66,5 +113,112 @@ class Competition(Base):
     location = Column(String, nullable=False)
     logo_url = Column(String, nullable=True)
 
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=True)   # league season the competition counts towards
+    season = relationship("Season", back_populates="competitions")
+
     # one-to-many relationship to Archer
-    archers = relationship("Archer", back_populates="competition", cascade="all, delete-orphan")
\ No newline at end of file
+    archers = relationship("Archer", back_populates="competition", cascade="all, delete-orphan")
+
+
+class ScoreEntry(Base):
+    """
+    A single scored arrow: the hit value an archer shot on one target.
+
+    Entries are append-only, the hit-count and total_score columns on Archer are
+    incremented in the same transaction as the insert.
+    """
+    __tablename__ = "score_entries"
+    __table_args__ = (
+        # one scoring arrow per target, also serves per-archer progress reads
+        Index("ux_score_entries_archer_target", "archer_id", "target", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    archer_id = Column(Integer, ForeignKey("archers.id", ondelete="CASCADE"), nullable=False)
+    target = Column(Integer, nullable=False)
+    value = Column(Integer, nullable=False)
+
+    archer = relationship("Archer", back_populates="score_entries")
+
+
+class Season(Base):
+    __tablename__ = "seasons"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    best_of = Column(Integer, nullable=True)    # only the best N results count, all if None
+
+    competitions = relationship("Competition", back_populates="season")
+
+
+class SeasonResult(Base):
+    """
+    An archer's result in one finalized competition of a season.
+    """
+    __tablename__ = "season_results"
+    __table_args__ = (
+        Index("ix_season_results_identity", "season_id", "archer_key", "category", "gender", "age_group"),
+        Index("ix_season_results_competition", "season_id", "competition_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    competition_id = Column(Integer, ForeignKey("competitions.id"), nullable=False)
+    archer_key = Column(String, nullable=False)     # normalized "first last" name, see parse.normalize_name
+    category = Column(SQLEnum(Category), nullable=False)
+    gender = Column(SQLEnum(Gender), nullable=False)
+    age_group = Column(SQLEnum(AgeGroup), nullable=False)
+    score = Column(Integer, nullable=False)
+
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
+    club = Column(String, nullable=True)
+
+
+class SeasonStanding(Base):
+    """
+    Materialized season standings, one row per archer identity and division.
+
+    Recomputed for the affected archers whenever a competition of the season is finalized.
+    """
+    __tablename__ = "season_standings"
+    __table_args__ = (
+        Index("ux_season_standings_identity", "season_id", "archer_key", "category", "gender", "age_group", unique=True),
+        Index("ix_season_standings_division_points", "season_id", "category", "gender", "age_group", "points"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
+    archer_key = Column(String, nullable=False)
+    category = Column(SQLEnum(Category), nullable=False)
+    gender = Column(SQLEnum(Gender), nullable=False)
+    age_group = Column(SQLEnum(AgeGroup), nullable=False)
+
+    # display values from the archer's most recent competition
+    first_name = Column(String, nullable=False)
+    last_name = Column(String, nullable=False)
+    club = Column(String, nullable=True)
+
+    points = Column(Integer, nullable=False)            # sum of the counted (best N) results
+    events_counted = Column(Integer, nullable=False)
+    events_shot = Column(Integer, nullable=False)
+
+
+class IdempotencyKey(Base):
+    # response of a write made with an Idempotency-Key header, returned again when the request is retried
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    scope = Column(String, nullable=False)              # method and path the key was used for
+    request_hash = Column(String, nullable=False)       # hash of the request payload, see idempotency.request_hash
+    status_code = Column(Integer, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(Float, nullable=False, index=True)
+
+
+class SchemaInfo(Base):
+    # single row holding the schema version the database was last prepared for
+    __tablename__ = "schema_info"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
@@ -1,62 +1,175 @@
 from translations import AGE_GROUP_TRANSLATIONS, CATEGORY_TRANSLATIONS, GENDER_TRANSLATIONS
+import codecs
+import io
+import re
+import unicodedata
+from csv import DictReader
+from enum import Enum
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Pattern, Tuple
 from models import Gender, Category, AgeGroup, Language
 
-def parse_category(category_value: str, language: Language):
-    print("language: ", language.value)
+# number of bytes inspected to guess the encoding of an uploaded CSV file
+ENCODING_SAMPLE_SIZE: int = 64 * 1024
 
-    # convert to lower-case
-    category_value = category_value.lower().strip()
+
+def detect_csv_encoding(binary: BinaryIO) -> str:
+    """
+    Guesses the encoding of an uploaded CSV file from its first bytes and rewinds the stream.
+
+    Google Forms exports are UTF-8 (optionally BOM-prefixed), files saved from Excel
+    on Slovenian Windows installs are cp1250.
+    """
+    sample: bytes = binary.read(ENCODING_SAMPLE_SIZE)
+    binary.seek(0)
+
+    try:
+        # incremental decoder tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "cp1250"
+
+    # utf-8-sig strips the BOM if present and is plain UTF-8 otherwise
+    return "utf-8-sig"
+
+
+def iter_csv_chunks(binary: BinaryIO, chunk_size: int) -> Iterator[List[Dict[str, str]]]:
+    """
+    Decodes an uploaded CSV file incrementally and yields its rows in lists of at most chunk_size.
+
+    Only one chunk of rows is held in memory at a time.
+    """
+    text = io.TextIOWrapper(binary, encoding=detect_csv_encoding(binary), newline="")  # type: ignore
+    try:
+        reader: DictReader[str] = DictReader(text)
+        chunk: List[Dict[str, str]] = []
+
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+    finally:
+        # detach so closing the wrapper does not close the underlying upload file
+        text.detach()
+
+
+# all languages' keywords are matched, registration files are Slovenian regardless of the UI language
+TRANSLATION_TABLES = (
+    ("category", CATEGORY_TRANSLATIONS),
+    ("gender", GENDER_TRANSLATIONS),
+    ("age_group", AGE_GROUP_TRANSLATIONS),
+)
+
+# age groups that do not compete separately by gender
+MIXED_AGE_GROUPS = {AgeGroup.U10}
+
+
+def compile_category_matcher(language: Language) -> Tuple[Pattern[str], Dict[str, Tuple[str, Enum]]]:
+    """
+    Compiles the translation tables into one regex matching any keyword as a whole word,
+    plus a lookup from keyword to (field, value). Keywords of the given language take
+    precedence over the same keyword in other languages.
+    """
+    keywords: Dict[str, Tuple[str, Enum]] = {}
+    for field, table in TRANSLATION_TABLES:
+        for table_language in sorted(table, key=lambda lang: lang == language):
+            for keyword, value in table[table_language].items():
+                keywords[keyword] = (field, value)
+
+    # longest keywords first so "goli lok" wins over "goli"
+    alternatives: str = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)"), keywords
+
+
+CATEGORY_MATCHERS: Dict[Language, Tuple[Pattern[str], Dict[str, Tuple[str, Enum]]]] = {
+    language: compile_category_matcher(language) for language in Language
+}
+
+
+def parse_category(category_value: str, language: Language) -> Tuple[Category, Gender, AgeGroup]:
+    # normalize so that differently formatted values share a cache entry
+    return _parse_normalized_category(" ".join(category_value.lower().split()), language)
+
+
+@lru_cache(maxsize=1024)
+def _parse_normalized_category(category_value: str, language: Language) -> Tuple[Category, Gender, AgeGroup]:
+    pattern, keywords = CATEGORY_MATCHERS[language]
 
     # default values
-    category = Category.GUEST
-    gender = Gender.MIXED
-    age_group = AgeGroup.ADULTS
-    
-    # parse category
-    if "goli" in category_value:
-        category = Category.BAREBOW
-    if "dolgi" in category_value:
-        category = Category.LONG_BOW
-    if "tradicionalni" in category_value:
-        category = Category.TRADITIONAL_BOW
-    if "primitivni" in category_value:
-        category = Category.PRIMITIVE_BOW
-        gender = Gender.MIXED
-    if "gosti" in category_value:
-        category = Category.GUEST
-        gender = Gender.MIXED
-    
-    # parse gender
-    if "ženske" in category_value or "zenske" in category_value or "punce" in category_value:
-        gender = Gender.FEMALE
-    if "moški" in category_value or "moski" in category_value or "fantje" in category_value:
-        gender = Gender.MALE
-    
-    # parse age group
-    if "u10" in category_value:
-        age_group = AgeGroup.U10
-        gender = Gender.MIXED
-    if "u15" in category_value:
-        age_group = AgeGroup.U15
-
-    # map category
-    # for key, enum_val in CATEGORY_TRANSLATIONS[language].items():
-    #     if key in category_value:
-    #         category = enum_val
-    #         break
-
-    # # map gender
-    # for key, enum_val in GENDER_TRANSLATIONS[language].items():
-    #     if key in category_value:
-    #         gender = enum_val
-    #         break
-
-    # # map age group
-    # for key, enum_val in AGE_GROUP_TRANSLATIONS[language].items():
-    #     if key in category_value:
-    #         age_group = enum_val
-    #         break
-
-    # print(f"Parsed category: {category}, gender: {gender}, age_group: {age_group} from value: '{category_value}'")
-
-    return category, gender, age_group
\ No newline at end of file
+    parsed: Dict[str, Enum] = {
+        "category": Category.GUEST,
+        "gender": Gender.MIXED,
+        "age_group": AgeGroup.ADULTS,
+    }
+
+    for match in pattern.finditer(category_value):
+        field, value = keywords[match.group()]
+        parsed[field] = value
+
+    if parsed["age_group"] in MIXED_AGE_GROUPS:
+        parsed["gender"] = Gender.MIXED
+
+    return parsed["category"], parsed["gender"], parsed["age_group"]  # type: ignore
+
+
+class _FoldTable(dict):
+    """
+    str.translate table that decomposes each character once and drops its combining marks.
+    """
+
+    def __missing__(self, code_point: int) -> str:
+        decomposed: str = unicodedata.normalize("NFKD", chr(code_point))
+        folded: str = "".join(char for char in decomposed if not unicodedata.combining(char))
+        self[code_point] = folded
+        return folded
+
+
+FOLD_TABLE: Dict[int, str] = _FoldTable({ord("đ"): "d"})
+
+
+def fold_text(value: str) -> str:
+    """
+    Lowercases the value and strips accents ("Oprešnik" -> "opresnik"), collapsing whitespace.
+    """
+    return " ".join(value.lower().translate(FOLD_TABLE).split())
+
+
+def normalize_name(first_name: str, last_name: str) -> str:
+    """
+    Accent- and case-insensitive identity of an archer across competitions ("Oprešnik" == "opresnik").
+    """
+    return fold_text(f"{first_name} {last_name}")
+
+
+def parse_archer_row(row: Dict[str, str], competition_id: int, language: Language) -> Optional[Dict[str, Any]]:
+    """
+    Converts a single registration CSV row into column values for the archers table.
+
+    Returns None if the row has no usable archer name.
+    """
+    full_name: str = (row.get("Ime in Priimek") or "").strip()
+    if not full_name:
+        return None
+
+    if " " in full_name:
+        first_name, last_name = full_name.split(' ', 1)
+    else:
+        first_name, last_name = full_name, ""
+
+    full_category: str = row.get("Slog") or ""
+    category, gender, age_group = parse_category(full_category, language)
+
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": row.get("Email") or "",
+        "club": row.get("Klub") or "",
+        "competition_id": competition_id,
+        "category": category,
+        "gender": gender,
+        "age_group": age_group,
+    }
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from models import AgeGroup, Category, Gender
-from typing import Optional
+from storage import logo_variant_url
+from typing import Any, Dict, List, Optional
 
 # ----------------------------
 # models for API requests
@@ -14,34 +15,77 @@ class ArcherCreate(BaseModel):
     category: Category
     gender: Gender
     age_group: AgeGroup
-    score20: Optional[int] = None
-    score18: Optional[int] = None
-    score16: Optional[int] = None
-    score14: Optional[int] = None
-    score12: Optional[int] = None
-    score10: Optional[int] = None
-    score8:  Optional[int] = None
-    score6:  Optional[int] = None
-    score4:  Optional[int] = None
-    score0:  Optional[int] = None
+    score20: Optional[int] = Field(None, ge=0)
+    score18: Optional[int] = Field(None, ge=0)
+    score16: Optional[int] = Field(None, ge=0)
+    score14: Optional[int] = Field(None, ge=0)
+    score12: Optional[int] = Field(None, ge=0)
+    score10: Optional[int] = Field(None, ge=0)
+    score8:  Optional[int] = Field(None, ge=0)
+    score6:  Optional[int] = Field(None, ge=0)
+    score4:  Optional[int] = Field(None, ge=0)
+    score0:  Optional[int] = Field(None, ge=0)
 
 class ArcherScoreUpdate(BaseModel):
     first_name: str
     last_name: str
     club: str
+    competition_id: Optional[int] = None
+    version: Optional[int] = None       # expected archer version, the write fails with 409 if it changed since
     category: Optional[Category] = None
     age_group: Optional[AgeGroup] = None
     gender: Optional[Gender] = None
-    score20: Optional[int] = None
-    score18: Optional[int] = None
-    score16: Optional[int] = None
-    score14: Optional[int] = None
-    score12: Optional[int] = None
-    score10: Optional[int] = None
-    score8:  Optional[int] = None
-    score6:  Optional[int] = None
-    score4:  Optional[int] = None
-    score0:  Optional[int] = None
+    score20: Optional[int] = Field(None, ge=0)
+    score18: Optional[int] = Field(None, ge=0)
+    score16: Optional[int] = Field(None, ge=0)
+    score14: Optional[int] = Field(None, ge=0)
+    score12: Optional[int] = Field(None, ge=0)
+    score10: Optional[int] = Field(None, ge=0)
+    score8:  Optional[int] = Field(None, ge=0)
+    score6:  Optional[int] = Field(None, ge=0)
+    score4:  Optional[int] = Field(None, ge=0)
+    score0:  Optional[int] = Field(None, ge=0)
+
+class ArcherPatch(BaseModel):
+    # only the fields that are sent are written
+    version: Optional[int] = None       # expected archer version, the write fails with 409 if it changed since
+    club: Optional[str] = None
+    category: Optional[Category] = None
+    gender: Optional[Gender] = None
+    age_group: Optional[AgeGroup] = None
+    score20: Optional[int] = Field(None, ge=0)
+    score18: Optional[int] = Field(None, ge=0)
+    score16: Optional[int] = Field(None, ge=0)
+    score14: Optional[int] = Field(None, ge=0)
+    score12: Optional[int] = Field(None, ge=0)
+    score10: Optional[int] = Field(None, ge=0)
+    score8:  Optional[int] = Field(None, ge=0)
+    score6:  Optional[int] = Field(None, ge=0)
+    score4:  Optional[int] = Field(None, ge=0)
+    score0:  Optional[int] = Field(None, ge=0)
+
+class ArcherScoreBatchItem(BaseModel):
+    archer_id: int
+    score20: Optional[int] = Field(None, ge=0)
+    score18: Optional[int] = Field(None, ge=0)
+    score16: Optional[int] = Field(None, ge=0)
+    score14: Optional[int] = Field(None, ge=0)
+    score12: Optional[int] = Field(None, ge=0)
+    score10: Optional[int] = Field(None, ge=0)
+    score8:  Optional[int] = Field(None, ge=0)
+    score6:  Optional[int] = Field(None, ge=0)
+    score4:  Optional[int] = Field(None, ge=0)
+    score0:  Optional[int] = Field(None, ge=0)
+
+class DivisionReassign(BaseModel):
+    archer_ids: Optional[List[int]] = None     # restrict to these archers, otherwise every filtered archer
+    category: Optional[Category] = None
+    gender: Optional[Gender] = None
+    age_group: Optional[AgeGroup] = None
+
+class ScoreEntryCreate(BaseModel):
+    target: int = Field(ge=1)
+    value: int
 
 class ArcherOut(BaseModel):
     id: int
@@ -64,11 +108,64 @@ class ArcherOut(BaseModel):
     score6:  Optional[int] = None
     score4:  Optional[int] = None
     score0:  Optional[int] = None
+    total_score: int = 0
+    version: int = 1
+
+    model_config = {
+        "from_attributes": True     # tells Pydantic it can read from SQLAlchemy objects
+    }
+
+class ArcherPage(BaseModel):
+    items: List[Dict[str, Any]]     # ArcherOut rows, restricted to the requested fields
+    next_cursor: Optional[str] = None
+
+class LeaderboardEntry(ArcherOut):
+    place: int
+
+class DivisionLeaderboard(BaseModel):
+    category: Category
+    gender: Gender
+    age_group: AgeGroup
+    archers: List[LeaderboardEntry]
+
+class ScoreBatchError(BaseModel):
+    archer_id: int
+    detail: str
+
+class ScoreBatchResult(BaseModel):
+    updated: List[ArcherOut]
+    errors: List[ScoreBatchError]
+
+class ScoreEntryOut(BaseModel):
+    id: int
+    archer_id: int
+    target: int
+    value: int
 
     model_config = {
         "from_attributes": True     # tells Pydantic it can read from SQLAlchemy objects
     }
 
+class TargetProgressOut(BaseModel):
+    archer_id: int
+    targets_shot: int
+    last_target: Optional[int] = None
+
+class ImportJobOut(BaseModel):
+    id: str
+    competition_id: int
+    status: str
+    rows_processed: int
+    rows_per_second: float
+    inserted: int
+    skipped: int
+    failed: int
+    errors: List[str]
+
+    model_config = {
+        "from_attributes": True     # tells Pydantic it can read from ImportJob objects
+    }
+
 class CompetitionCreate(BaseModel):
     name: str
     date: str
@@ -81,7 +178,44 @@ class CompetitionOut(BaseModel):
     date: str
     location: str
     logo_url: Optional[str] = None
+    season_id: Optional[int] = None
+
+    @computed_field
+    @property
+    def logo_thumb_url(self) -> Optional[str]:
+        return logo_variant_url(self.logo_url, "thumb")
+
+    @computed_field
+    @property
+    def logo_large_url(self) -> Optional[str]:
+        return logo_variant_url(self.logo_url, "large")
 
     model_config = {
         "from_attributes": True     # tells Pydantic it can read from SQLAlchemy objects
-    }
\ No newline at end of file
+    }
+
+class SeasonCreate(BaseModel):
+    name: str
+    best_of: Optional[int] = Field(None, ge=1)
+
+class SeasonOut(BaseModel):
+    id: int
+    name: str
+    best_of: Optional[int] = None
+
+    model_config = {
+        "from_attributes": True     # tells Pydantic it can read from SQLAlchemy objects
+    }
+
+class StandingOut(BaseModel):
+    place: int
+    archer_key: str
+    first_name: str
+    last_name: str
+    club: Optional[str] = None
+    category: Category
+    gender: Gender
+    age_group: AgeGroup
+    points: int
+    events_counted: int
+    events_shot: int
@@ -0,0 +1,121 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Select, column, delete, insert, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database import IN_BATCH_SIZE, batches
+from models import Archer
+from parse import fold_text
+
+# columns an archer is found by, folded into a single accent-free text per archer
+SEARCH_COLUMNS: List[Any] = [Archer.id, Archer.competition_id, Archer.first_name, Archer.last_name, Archer.club, Archer.email]
+
+# the FTS5 table on SQLite is keyed by its rowid, the plain table elsewhere by archer_id
+archer_search = table("archer_search", column("rowid"), column("archer_id"), column("competition_id"), column("content"))
+
+TOKEN = re.compile(r"\w+")
+
+
+def search_text(first_name: str, last_name: str, club: str, email: str) -> str:
+    return fold_text(f"{first_name} {last_name} {club or ''} {email or ''}")
+
+
+def create_search_index(bind: Engine) -> None:
+    """
+    Creates the archer_search table if it is missing and fills it from the existing archers.
+
+    SQLite gets an FTS5 table keyed by the archer id with prefix indexes, so prefix queries
+    stay fast however many archers there are. PostgreSQL gets a plain table with a trigram
+    index; other databases fall back to the same table without it.
+    """
+    with bind.begin() as connection:
+        dialect: str = connection.dialect.name
+        if dialect == "sqlite":
+            if connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'archer_search'")).first():
+                return
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE archer_search USING fts5("
+                "content, competition_id, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+        else:
+            if connection.execute(text("SELECT 1 FROM information_schema.tables WHERE table_name = 'archer_search'")).first():
+                return
+            connection.execute(text(
+                "CREATE TABLE archer_search ("
+                "archer_id INTEGER PRIMARY KEY REFERENCES archers (id) ON DELETE CASCADE, "
+                "competition_id INTEGER NOT NULL, content TEXT NOT NULL)"
+            ))
+            connection.execute(text("CREATE INDEX ix_archer_search_competition ON archer_search (competition_id)"))
+            if dialect == "postgresql":
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                connection.execute(text("CREATE INDEX ix_archer_search_content ON archer_search USING gin (content gin_trgm_ops)"))
+
+        for rows in connection.execute(select(*SEARCH_COLUMNS)).partitions(IN_BATCH_SIZE):
+            index_archers(connection, rows, replace=False)
+
+
+def _key(db: Any) -> Any:
+    bind: Any = db.get_bind() if isinstance(db, Session) else db
+    return archer_search.c.rowid if bind.dialect.name == "sqlite" else archer_search.c.archer_id
+
+
+def index_archers(db: Any, rows: Iterable[Any], replace: bool = True) -> None:
+    """
+    Adds or replaces the search entries of the given archers (rows with the SEARCH_COLUMNS),
+    in a session or connection. Newly inserted archers have no entries yet and skip the
+    delete with replace=False.
+    """
+    key: Any = _key(db)
+    entries: List[Dict[str, Any]] = [{
+        key.name: row.id,
+        "competition_id": row.competition_id,
+        "content": search_text(row.first_name, row.last_name, row.club, row.email),
+    } for row in rows]
+    if not entries:
+        return
+
+    if replace:
+        unindex_archers(db, [entry[key.name] for entry in entries])
+    db.execute(insert(archer_search), entries)
+
+
+def unindex_archers(db: Any, archer_ids: Sequence[int]) -> None:
+    key: Any = _key(db)
+    for ids in batches(archer_ids):
+        db.execute(delete(archer_search).where(key.in_(ids)))
+
+
+def unindex_selected(db: Session, archer_ids: Select) -> None:
+    # set-based variant for the bulk delete paths, archer_ids is a SELECT of Archer.id
+    db.execute(delete(archer_search).where(_key(db).in_(archer_ids)))
+
+
+def search_statement(columns: List[Any], competition_id: int, query: str, limit: int, dialect: str) -> Optional[Select]:
+    """
+    Archers of the competition with words (name, club or email) starting with every word
+    of the query, ignoring case and accents. Best matches come first on SQLite, which
+    ranks FTS5 matches; other databases match substrings and order by name.
+
+    Returns None if the query has no words to search for.
+    """
+    tokens: List[str] = TOKEN.findall(fold_text(query))
+    if not tokens:
+        return None
+
+    if dialect == "sqlite":
+        # every query word becomes a quoted prefix term, so input cannot inject FTS5 syntax
+        terms: str = " ".join(f'"{token}"*' for token in tokens)
+        matches = select(archer_search.c.rowid.label("archer_id"), literal_column("rank").label("rank")).where(
+            text("archer_search MATCH :match").bindparams(match=f'competition_id : "{competition_id}" AND content : ({terms})')
+        ).subquery()
+        order: List[Any] = [matches.c.rank]
+    else:
+        matches = select(archer_search.c.archer_id).where(
+            archer_search.c.competition_id == competition_id,
+            *(archer_search.c.content.like(f"%{token}%") for token in tokens),
+        ).subquery()
+        order = [Archer.last_name]
+
+    return select(*columns).join(matches, Archer.id == matches.c.archer_id).order_by(*order, Archer.first_name).limit(limit)
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import batches
+from models import Archer, Competition, Season, SeasonResult, SeasonStanding
+from parse import normalize_name
+
+def finalize_competition(db: Session, competition: Competition) -> int:
+    """
+    Records the competition's results in its season and refreshes the standings of every
+    archer whose results changed. Finalizing again replaces the earlier results.
+
+    Returns the number of archer identities whose standings were recomputed.
+    """
+    season_id: int = competition.season_id  # type: ignore
+
+    # archers that had results from an earlier finalization may have been removed since
+    affected: Set[str] = _remove_results(db, season_id, competition.id)  # type: ignore
+
+    results: List[Dict[str, Any]] = []
+    for first_name, last_name, club, category, gender, age_group, total_score in db.query(
+        Archer.first_name, Archer.last_name, Archer.club,
+        Archer.category, Archer.gender, Archer.age_group, Archer.total_score
+    ).filter(Archer.competition_id == competition.id).all():
+        archer_key: str = normalize_name(first_name, last_name)
+        affected.add(archer_key)
+        results.append({
+            "season_id": season_id,
+            "competition_id": competition.id,
+            "archer_key": archer_key,
+            "category": category,
+            "gender": gender,
+            "age_group": age_group,
+            "score": total_score,
+            "first_name": first_name,
+            "last_name": last_name,
+            "club": club,
+        })
+
+    if results:
+        db.execute(insert(SeasonResult), results)
+
+    update_standings(db, competition.season, sorted(affected))  # type: ignore
+    return len(affected)
+
+
+def withdraw_competition(db: Session, season: Season, competition_id: int) -> int:
+    """
+    Removes a competition's results from the season, e.g. when it moves to another season,
+    and refreshes the standings of the archers that had them.
+
+    Returns the number of archer identities whose standings were recomputed.
+    """
+    affected: Set[str] = _remove_results(db, season.id, competition_id)  # type: ignore
+    update_standings(db, season, sorted(affected))
+    return len(affected)
+
+
+def _remove_results(db: Session, season_id: int, competition_id: int) -> Set[str]:
+    # deletes the competition's season results, returns the archer keys they belonged to
+    affected: Set[str] = {
+        archer_key for (archer_key,) in db.query(SeasonResult.archer_key).filter(
+            SeasonResult.season_id == season_id,
+            SeasonResult.competition_id == competition_id
+        ).all()
+    }
+    db.query(SeasonResult).filter(
+        SeasonResult.season_id == season_id,
+        SeasonResult.competition_id == competition_id
+    ).delete(synchronize_session=False)
+    return affected
+
+
+def update_standings(db: Session, season: Season, archer_keys: Sequence[str]) -> None:
+    """
+    Recomputes the standings rows of the given archer identities from their season results,
+    counting only the best season.best_of results per division.
+    """
+    for keys in batches(archer_keys):
+        db.query(SeasonStanding).filter(
+            SeasonStanding.season_id == season.id,
+            SeasonStanding.archer_key.in_(keys)
+        ).delete(synchronize_session=False)
+
+        # results per identity and division, most recent competition first for display values
+        grouped: Dict[Tuple[Any, ...], List[SeasonResult]] = {}
+        for result in db.query(SeasonResult).filter(
+            SeasonResult.season_id == season.id,
+            SeasonResult.archer_key.in_(keys)
+        ).order_by(SeasonResult.competition_id.desc()).all():
+            identity = (result.archer_key, result.category, result.gender, result.age_group)
+            grouped.setdefault(identity, []).append(result)
+
+        standings: List[Dict[str, Any]] = []
+        for (archer_key, category, gender, age_group), division_results in grouped.items():
+            best_of: Optional[int] = season.best_of  # type: ignore
+            counted: List[int] = sorted((result.score for result in division_results), reverse=True)[:best_of]
+            latest: SeasonResult = division_results[0]
+            standings.append({
+                "season_id": season.id,
+                "archer_key": archer_key,
+                "category": category,
+                "gender": gender,
+                "age_group": age_group,
+                "first_name": latest.first_name,
+                "last_name": latest.last_name,
+                "club": latest.club,
+                "points": sum(counted),
+                "events_counted": len(counted),
+                "events_shot": len(division_results),
+            })
+
+        if standings:
+            db.execute(insert(SeasonStanding), standings)
@@ -1,16 +1,50 @@
+import hashlib
+import json
 import os
 import re
-import uuid
-from typing import Optional
+import tempfile
+import threading
+from typing import Dict, List, Optional
 from fastapi import FastAPI, UploadFile
 from fastapi.staticfiles import StaticFiles
-from constants import UPLOAD_DIR
+from constants import LOGO_VARIANTS, UPLOAD_DIR, UPLOAD_STATE_DIR
+
+# size of the chunks uploads are read and written in
+CHUNK_SIZE: int = 64 * 1024
+
+# competition name -> logo filename, replaces scanning UPLOAD_DIR on every save
+INDEX_FILE: str = os.path.join(UPLOAD_STATE_DIR, "logo_index.json")
+
+# where earlier versions kept the index, inside the served directory
+LEGACY_INDEX_FILE: str = os.path.join(UPLOAD_DIR, "logo_index.json")
+
+_index_lock = threading.Lock()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Static files whose names never change content (content hashes, unique ids),
+    so browsers may cache them for good.
+    """
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 
 def setup_storage(app: FastAPI):
     # ensure upload logo directory exists
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    os.makedirs(UPLOAD_STATE_DIR, exist_ok=True)
+    if not os.path.exists(INDEX_FILE):
+        if os.path.exists(LEGACY_INDEX_FILE):
+            os.replace(LEGACY_INDEX_FILE, INDEX_FILE)
+        else:
+            _write_index(_build_legacy_index())
     # mount static files folder
-    app.mount("/logos", StaticFiles(directory=UPLOAD_DIR), name="logos")
+    app.mount("/logos", ImmutableStaticFiles(directory=UPLOAD_DIR), name="logos")
 
 
 def sanitize_string(name: str) -> str:
@@ -18,35 +52,119 @@ def sanitize_string(name: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_\-\.]', '_', name)
 
 
+def _build_legacy_index() -> Dict[str, str]:
+    # one-time scan of logos saved as <competition>_<uuid><ext> before the index existed
+    index: Dict[str, str] = {}
+    for existing_file in sorted(os.listdir(UPLOAD_DIR), key=lambda f: os.path.getmtime(os.path.join(UPLOAD_DIR, f))):
+        if "_" in existing_file:
+            index[existing_file.rsplit("_", 1)[0]] = existing_file
+    return index
+
+
+def _read_index() -> Dict[str, str]:
+    try:
+        with open(INDEX_FILE, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(index: Dict[str, str]) -> None:
+    # write to a temp file first so a crash never leaves a half-written index
+    fd, path = tempfile.mkstemp(dir=UPLOAD_STATE_DIR, suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(path, INDEX_FILE)
+
+
+def variant_filename(filename: str, variant: str) -> str:
+    return f"{os.path.splitext(filename)[0]}_{variant}.png"
+
+
+def logo_variant_url(logo_url: Optional[str], variant: str) -> Optional[str]:
+    """
+    URL of a resized logo variant, or of the original if the variant was not generated.
+    """
+    if logo_url is None:
+        return None
+    filename: str = variant_filename(os.path.basename(logo_url), variant)
+    if os.path.exists(os.path.join(UPLOAD_DIR, filename)):
+        return f"/logos/{filename}"
+    return logo_url
+
+
+def _logo_files(filename: str) -> List[str]:
+    return [filename, *(variant_filename(filename, variant) for variant in LOGO_VARIANTS)]
+
+
+def _create_variants(filename: str) -> None:
+    # Pillow is optional, without it the original logo is served everywhere
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+
+    try:
+        with Image.open(os.path.join(UPLOAD_DIR, filename)) as image:
+            for variant, size in LOGO_VARIANTS.items():
+                resized = image.copy()
+                resized.thumbnail((size, size))
+                resized.save(os.path.join(UPLOAD_DIR, variant_filename(filename, variant)), format="PNG", optimize=True)
+    except OSError:
+        # not an image Pillow can read (e.g. SVG), keep serving the original
+        return
+
+
 def save_uploaded_file(
     file: Optional[UploadFile],
     competition_name: str,
 ) -> Optional[str]:
     """
-    Saves an uploaded file and removes ALL existing files belonging
-    to the same competition in UPLOAD_DIR.
+    Saves an uploaded file under its content hash and removes the previous
+    logo of the same competition.
 
     Returns None if no file is provided.
     """
     safe_competition_name: str = sanitize_string(competition_name)
 
-    # remove all existing files for this competition
-    for existing_file in os.listdir(UPLOAD_DIR):
-        if existing_file.startswith(safe_competition_name + "_"):
-            os.remove(os.path.join(UPLOAD_DIR, existing_file))
+    new_filename: Optional[str] = None
+    if file:
+        # stream the upload to disk in chunks while hashing it, outside the served directory
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=UPLOAD_STATE_DIR, suffix=".upload")
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := file.file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        ext: str = os.path.splitext(str(file.filename))[1].lower()
+        new_filename = f"{digest.hexdigest()[:32]}{ext}"
+        new_path: str = os.path.join(UPLOAD_DIR, new_filename)
+
+        if os.path.exists(new_path):
+            # identical logo already stored (and resized)
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, new_path)
+            _create_variants(new_filename)
+
+    with _index_lock:
+        index: Dict[str, str] = _read_index()
+        old_filename: Optional[str] = index.pop(safe_competition_name, None)
+        if new_filename is not None:
+            index[safe_competition_name] = new_filename
+        _write_index(index)
+
+        # remove the previous logo unless another competition uses the same file
+        if old_filename is not None and old_filename != new_filename and old_filename not in index.values():
+            for old_file in _logo_files(old_filename):
+                old_path: str = os.path.join(UPLOAD_DIR, old_file)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
 
     # if no new file, return None (deletes logo)
-    if not file:
+    if new_filename is None:
         return None
-    
-    # create new filename
-    ext: str = os.path.splitext(str(file.filename))[1]
-    filename: str = f"{safe_competition_name}_{uuid.uuid4()}{ext}"
-    filepath: str = os.path.join(UPLOAD_DIR, filename)
-
-    # write file
-    with open(filepath, "wb") as buffer:
-        buffer.write(file.file.read())
 
     # return relative URL for frontend use
-    return f"/logos/{filename}"
+    return f"/logos/{new_filename}"
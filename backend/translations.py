@@ -3,9 +3,13 @@ from models import AgeGroup, Category, Gender, Language
 CATEGORY_TRANSLATIONS = {
     Language.SL: {
         'goli lok': Category.BAREBOW,
+        'goli': Category.BAREBOW,
         'dolgi lok': Category.LONG_BOW,
+        'dolgi': Category.LONG_BOW,
         'tradicionalni lok': Category.TRADITIONAL_BOW,
+        'tradicionalni': Category.TRADITIONAL_BOW,
         'primitivni lok': Category.PRIMITIVE_BOW,
+        'primitivni': Category.PRIMITIVE_BOW,
         'gosti': Category.GUEST,
     },
     Language.EN: {
@@ -20,8 +24,13 @@ CATEGORY_TRANSLATIONS = {
 GENDER_TRANSLATIONS = {
     Language.SL: {
         'moški': Gender.MALE,
+        'moski': Gender.MALE,
+        'fantje': Gender.MALE,
         'ženske': Gender.FEMALE,
+        'zenske': Gender.FEMALE,
+        'punce': Gender.FEMALE,
         'mešano': Gender.MIXED,
+        'mesano': Gender.MIXED,
     },
     Language.EN: {
         'male': Gender.MALE,
@@ -41,4 +50,4 @@ AGE_GROUP_TRANSLATIONS = {
         'u15': AgeGroup.U15,
         'adults': AgeGroup.ADULTS,
     }
-}
\ No newline at end of file
+}
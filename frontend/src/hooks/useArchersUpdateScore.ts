@@ -6,7 +6,8 @@ export const useArchersUpdateScore = (competitionId: number) => {
   const queryClient = useQueryClient();
 
   return useMutation<void, Error, ArcherUpdate>({
-    mutationFn: updateArcherScore,
+    mutationFn: (update: ArcherUpdate) =>
+      updateArcherScore({ ...update, competition_id: competitionId }),
     onSuccess: () => {
       if (competitionId) {
         queryClient.invalidateQueries({
@@ -28,7 +28,7 @@ export type ScoreKey = `score${(typeof scoreKeys)[number]}`;
 export type ArcherScores = Pick<Archer, ScoreKey>;
 export type ArcherUpdate = Pick<Archer, 'first_name' | 'last_name'> &
   Partial<Pick<Archer, 'club' | 'category' | 'age_group' | 'gender'>> &
-  ArcherScores;
+  ArcherScores & { competition_id?: number };
 
 export type Language = (typeof SUPPORTED_LANGUAGES)[number];
 